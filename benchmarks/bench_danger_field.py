@@ -0,0 +1,97 @@
+"""
+危险度场增量更新：随机的敌人出现/消失/移动序列 vs 每次重新构建
+
+每一步都把增量更新后的距离与用当前全部敌人重新构建的危险度场逐格比较，
+并检查逃跑目的地不会落在有敌人的格子上（包括被敌人夹住、无处可逃的情形）；
+出现不一致时以非零状态退出。
+
+用法（在项目根目录下）:
+    python -m benchmarks.bench_danger_field [--maps N] [--size N] [--steps N] [--seed N]
+"""
+import argparse
+import random
+import sys
+import time
+
+from src.map import GameMap
+from src.systems.danger_field import WALL, DangerField, plan_flee
+
+def empty_cells(game_map):
+    return [(x, y) for y in range(game_map.size) for x in range(game_map.size) if not game_map.is_wall(x, y)]
+
+def random_step(rng, field, sources, floor, game_map):
+    """对field和sources做一次随机的出现/消失/移动，返回操作名称"""
+    action = rng.choice(("add", "remove", "move")) if sources else "add"
+    if action == "add":
+        cell = rng.choice(floor)
+        field.add_source(cell)
+        sources.append(cell)
+    elif action == "remove":
+        cell = sources.pop(rng.randrange(len(sources)))
+        field.remove_source(cell)
+    else:
+        i = rng.randrange(len(sources))
+        x, y = sources[i]
+        options = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if not game_map.is_wall(x + dx, y + dy)]
+        if not options:
+            return action
+        cell = rng.choice(options)
+        field.move_source(sources[i], cell)
+        sources[i] = cell
+    return action
+
+def check_cornered():
+    """一格宽的走廊中，玩家两侧都是敌人：没有可去的格子，应返回None"""
+    stride = 5
+    cells = bytearray([WALL] * stride + [WALL, 0, 0, 0, WALL] + [WALL] * stride)
+    field = DangerField(cells, stride, [(0, 0), (2, 0)])
+    return plan_flee(field, cells, stride, (1, 0)) is None
+
+def main():
+    parser = argparse.ArgumentParser(description="危险度场增量更新校验")
+    parser.add_argument("--maps", type=int, default=5, help="测试地图数量")
+    parser.add_argument("--size", type=int, default=31, help="地图大小")
+    parser.add_argument("--steps", type=int, default=400, help="每张地图的随机操作数")
+    parser.add_argument("--seed", type=int, default=1234, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    incremental_time = 0.0
+    rebuild_time = 0.0
+    mismatches = 0
+    bad_flee = 0
+    counts = {"add": 0, "remove": 0, "move": 0}
+    for map_index in range(args.maps):
+        game_map = GameMap(size=args.size, seed=args.seed + map_index)
+        cells, stride = game_map.cells, game_map.stride
+        floor = empty_cells(game_map)
+        sources = rng.sample(floor, min(8, len(floor)))
+        field = DangerField(cells, stride, sources)
+        for _ in range(args.steps):
+            start = time.perf_counter()
+            counts[random_step(rng, field, sources, floor, game_map)] += 1
+            incremental_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            fresh = DangerField(cells, stride, sources)
+            rebuild_time += time.perf_counter() - start
+            if field._dist != fresh._dist:
+                mismatches += 1
+
+            target = plan_flee(field, cells, stride, rng.choice(floor))
+            if target is not None and field.distance(*target) == 0:
+                bad_flee += 1
+        game_map.shutdown()
+
+    total = args.maps * args.steps
+    print(f"地图: {args.maps} x {args.size}x{args.size}, 操作: {total} 次 "
+          f"(出现 {counts['add']} / 消失 {counts['remove']} / 移动 {counts['move']})")
+    print(f"增量更新: {incremental_time / total * 1000:.3f} ms/次，重新构建: {rebuild_time / total * 1000:.3f} ms/次")
+    print(f"与重新构建不一致: {mismatches} 次，逃到敌人格子: {bad_flee} 次")
+    cornered = check_cornered()
+    print(f"被敌人夹住时不逃跑: {'通过' if cornered else '失败'}")
+    return 1 if mismatches or bad_flee or not cornered else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
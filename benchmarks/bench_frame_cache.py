@@ -0,0 +1,79 @@
+"""
+帧缓存命中率：玩家原地轮流转向四个方向，同时怪物在地图上游走
+
+每次命中都与重新渲染的画面逐像素比较，确认缓存帧没有过期；
+没有命中或出现过期帧时以非零状态退出。
+
+用法（在项目根目录下）:
+    python -m benchmarks.bench_frame_cache [--size N] [--laps N] [--seed N]
+"""
+import argparse
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from src.map import GameMap
+from src.systems.monster_ai import MonsterAI
+from src.ui.first_person_view import FirstPersonView
+
+MONSTER_TICK_MS = 400  # 每次转向之间推进的怪物AI时间
+
+def render_and_check(view):
+    """渲染当前视角，命中缓存时返回缓存帧是否与重新渲染的画面一致，未命中时返回None"""
+    hits = view.frame_cache.hits
+    view.render_view()
+    if view.frame_cache.hits == hits:
+        return None
+    cached = view.current_frame.toImage()
+    view.render_sync(view.game_map.player_x, view.game_map.player_y, None)
+    return cached.convertToFormat(view.frame_buffer.format()) == view.frame_buffer
+
+def main():
+    parser = argparse.ArgumentParser(description="帧缓存命中率")
+    parser.add_argument("--size", type=int, default=11, help="地图大小")
+    parser.add_argument("--laps", type=int, default=40, help="转向的圈数（每圈四个方向）")
+    parser.add_argument("--seed", type=int, default=1234, help="随机种子")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)  # 创建窗口部件前必须有QApplication
+    game_map = GameMap(size=args.size, seed=args.seed)
+    view = FirstPersonView(game_map)
+    monster_ai = MonsterAI(game_map, seed=args.seed)
+    player_cell = (int(game_map.player_x), int(game_map.player_y))
+
+    now = 0
+    checked = 0
+    stale = 0
+    moves = 0
+    for _ in range(args.laps):
+        for direction in (0, 90, 180, 270):
+            view.player_dir = direction
+            result = render_and_check(view)
+            if result is not None:
+                checked += 1
+                stale += not result
+            now += MONSTER_TICK_MS
+            changed = monster_ai.update(now, player_cell)
+            if changed:
+                game_map.mark_changed(*changed)
+                moves += len(changed) // 2
+
+    cache = view.frame_cache
+    print(f"地图: {args.size}x{args.size}, 转向 {args.laps * 4} 次, 怪物移动 {moves} 次")
+    print(cache.stats_text())
+    print(f"逐像素校验: {checked} 次命中, {stale} 次过期")
+    game_map.shutdown()
+
+    if cache.hits == 0:
+        print("错误: 回到已访问的视角时没有命中缓存")
+        return 1
+    if stale:
+        print("错误: 缓存帧与重新渲染的画面不一致")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+射线投射性能对比：固定步长步进 vs DDA网格遍历 vs NumPy批量DDA
+
+用法（在项目根目录下）:
+    python -m benchmarks.bench_raycast [--maps N] [--size N] [--rays N] [--seed N]
+"""
+import argparse
+import math
+import random
+import time
+
+from src.map import GameMap
+from src.systems.raycaster import (
+    RAY_CASTERS, RAY_CASTER_MARCH, RAY_CASTER_DDA, RAY_CASTER_NUMPY,
+    ray_angle, grid_to_array, cast_rays_batch
+)
+
+class CountingMap:
+    """包装GameMap，统计is_wall调用次数"""
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.calls = 0
+
+    def is_wall(self, x, y):
+        self.calls += 1
+        return self.game_map.is_wall(x, y)
+
+def collect_poses(game_map):
+    """收集所有空地格子中心的四个朝向作为测试视角"""
+    poses = []
+    for y in range(game_map.size):
+        for x in range(game_map.size):
+            if not game_map.is_wall(x, y):
+                for direction in (0, 90, 180, 270):
+                    poses.append((x + 0.5, y + 0.5, direction))
+    return poses
+
+def run_caster(caster, counting_map, poses, num_rays):
+    """用指定算法投射所有视角的射线，返回 (耗时, [(命中结果, sin, cos), ...])"""
+    results = []
+    start = time.perf_counter()
+    for px, py, direction in poses:
+        for i in range(num_rays):
+            angle = ray_angle(direction, i, num_rays)
+            sin_a, cos_a = math.sin(angle), math.cos(angle)
+            results.append((caster(counting_map, px, py, sin_a, cos_a), sin_a, cos_a))
+    return time.perf_counter() - start, results
+
+def run_batch(game_map, poses, num_rays):
+    """用NumPy批量投射所有视角，返回 (耗时, 每条射线的距离列表)"""
+    grid_array = grid_to_array(game_map.grid)
+    dists = []
+    start = time.perf_counter()
+    for px, py, direction in poses:
+        dist, side, texture_offset, brightness, hit = cast_rays_batch(grid_array, px, py, direction, num_rays)
+        dists.append(dist)
+    elapsed = time.perf_counter() - start
+    return elapsed, [d for frame in dists for d in frame.tolist()]
+
+def main():
+    parser = argparse.ArgumentParser(description="射线投射性能对比")
+    parser.add_argument("--maps", type=int, default=5, help="测试地图数量")
+    parser.add_argument("--size", type=int, default=11, help="地图大小")
+    parser.add_argument("--rays", type=int, default=120, help="每帧射线数量")
+    parser.add_argument("--seed", type=int, default=1234, help="随机种子")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    maps = [GameMap(size=args.size) for _ in range(args.maps)]
+
+    stats = {}
+    hits = {}
+    for name in (RAY_CASTER_MARCH, RAY_CASTER_DDA):
+        total_time = 0.0
+        total_calls = 0
+        total_rays = 0
+        hits[name] = []
+        for game_map in maps:
+            poses = collect_poses(game_map)
+            counting_map = CountingMap(game_map)
+            elapsed, results = run_caster(RAY_CASTERS[name], counting_map, poses, args.rays)
+            total_time += elapsed
+            total_calls += counting_map.calls
+            total_rays += len(results)
+            hits[name].extend(results)
+        frames = total_rays / args.rays
+        stats[name] = (total_time, total_calls, total_rays, frames)
+
+    total_time = 0.0
+    total_rays = 0
+    batch_dists = []
+    for game_map in maps:
+        poses = collect_poses(game_map)
+        elapsed, dists = run_batch(game_map, poses, args.rays)
+        total_time += elapsed
+        total_rays += len(dists)
+        batch_dists.extend(dists)
+    stats[RAY_CASTER_NUMPY] = (total_time, 0, total_rays, total_rays / args.rays)
+
+    print(f"地图: {args.maps} x {args.size}x{args.size}, 每帧射线: {args.rays}")
+    print(f"{'算法':<8}{'总耗时(s)':>12}{'每帧(ms)':>12}{'is_wall/射线':>16}")
+    for name, (total_time, total_calls, total_rays, frames) in stats.items():
+        calls_per_ray = f"{total_calls / total_rays:.2f}" if total_calls else "-"
+        print(f"{name:<8}{total_time:>12.3f}{total_time / frames * 1000:>12.3f}{calls_per_ray:>16}")
+
+    # 两种算法结果对比：命中的墙格是否一致、距离误差
+    same_cell = 0
+    dist_error = 0.0
+    compared = 0
+    for (old, _, _), (new, sin_a, cos_a) in zip(hits[RAY_CASTER_MARCH], hits[RAY_CASTER_DDA]):
+        if old is None or new is None:
+            continue
+        compared += 1
+        dist_error += abs(old[2] - new[2])
+        # DDA命中点恰好落在格子边界上，沿射线方向微移后取所在格子
+        new_cell = (int(new[0] + 1e-6 * cos_a), int(new[1] + 1e-6 * sin_a))
+        if (int(old[0]), int(old[1])) == new_cell:
+            same_cell += 1
+    if compared:
+        print(f"命中同一墙格: {same_cell / compared * 100:.1f}%，平均距离差: {dist_error / compared:.4f}")
+
+    # NumPy批量结果应与逐条DDA一致
+    max_error = max((abs(hit[0][2] - d) for hit, d in zip(hits[RAY_CASTER_DDA], batch_dists) if hit[0]),
+                    default=0.0)
+    print(f"NumPy与DDA最大距离差: {max_error:.2e}")
+
+if __name__ == "__main__":
+    main()
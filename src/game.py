@@ -21,10 +21,34 @@ from .systems.skills import create_skills, check_skill_combo
 from .systems.items import create_items
 from .systems.monsters import create_monster, get_monster_config, get_boss_types, get_boss_config
 from .systems.experience import get_experience_config
+from .systems.utils import get_user_data_dir
 from .ui.start_screen import StartScreen
 from .ui.death_screen import DeathScreen
+from .systems.ray_table import RAY_TABLE_LAZY, RAY_TABLE_EAGER
+from .systems.level_prefetch import LevelPrefetcher
+from .systems.level_cache import LevelCache, derive_level_seed
+from .systems.flow_field import FlowFieldCache, UNREACHABLE
+from .systems.monster_ai import MonsterAI
+from .systems.danger_field import plan_flee
+from .systems.raycaster import MAX_DIST
+from .ui.render_quality import RenderQualityGovernor
+from .systems.profiler import FrameProfiler, profiled
 
 DEV_MODE_ENABLED = True  # 将此设置为 True 以启用开发者模式
+# 射线命中表模式："lazy"、"eager" 或 None（不使用）。
+# 命中表按列数分别保存，渲染质量控制器改变射线数量后仍然查表（每种列数首次到达某视角时计算一次）
+RAY_TABLE_MODE = RAY_TABLE_LAZY
+FRAME_BUDGET_MS = 33  # 第一人称视图每帧渲染预算（毫秒），超出时自动降低渲染质量
+ASYNC_RAY_COMPUTE = True  # 在后台线程中投射射线，界面线程只负责绘制
+PROFILE_EXPORT_PATH = get_user_data_dir("frame_profile.json")  # 开发者模式下退出时导出的性能数据
+RUN_SEED = None  # 整局随机种子，固定后每次开局生成相同的关卡序列（None 表示每局随机）
+# 已生成关卡的磁盘缓存目录（也可放入预生成的关卡包），None 表示不缓存。
+# 只在固定 RUN_SEED 时启用：每局随机的种子不会再次出现，缓存的关卡永远不会被读取
+LEVEL_CACHE_DIR = get_user_data_dir("level_cache")
+# 自动行走时每一步的朝向：(格子dx, 格子dy) -> 视角方向（与WASD移动的方向约定一致）
+TRAVEL_DIRECTIONS = {(1, 0): 0, (0, 1): 90, (-1, 0): 180, (0, -1): 270}
+ROAMING_MONSTERS = True  # 怪物巡逻并追击玩家（False 时怪物固定在出生点）
+DEV_MONSTER_LIST_LIMIT = 50  # 开发者模式怪物列表最多显示的条数
 
 class RPGGame(QMainWindow):
     def __init__(self):
@@ -46,8 +70,18 @@ class RPGGame(QMainWindow):
         self.last_move_time = 0
         self.move_cooldown = 100
         self.player_dir = 0  # 默认视角J（北/上）- 0度
+        # 自动行走（小地图点击 / T键前往出口）
+        self.flow_fields = FlowFieldCache()
+        self.travel_target = None
+        self.travel_field = None  # 开始自动行走时的距离场（途中新探索的格子不影响已规划的路线）
+        # 性能统计（开发者模式下启用）
+        self.profiler = FrameProfiler(enabled=DEV_MODE_ENABLED)
         # 传送模式
         self.teleport_mode = False
+        # 关卡种子与缓存，后台预生成下一关地图
+        self.run_seed = self.new_run_seed()
+        self.level_cache = LevelCache(LEVEL_CACHE_DIR) if LEVEL_CACHE_DIR and RUN_SEED is not None else None
+        self.level_prefetcher = LevelPrefetcher(self.build_level_map)
         # 死亡处理
         self.player_died = False
         self.death_timer = QTimer()
@@ -91,10 +125,36 @@ class RPGGame(QMainWindow):
         # 确保窗口大小变化时UI能自适应
         self.resizeEvent = self.custom_resize_event
     
+    @staticmethod
+    def new_run_seed():
+        """新一局的种子"""
+        return RUN_SEED if RUN_SEED is not None else random.getrandbits(64)
+    
+    def level_seed(self, level):
+        """本局第level关的种子"""
+        return derive_level_seed(self.run_seed, level)
+    
+    def build_level_map(self, level, seed, cancelled=None):
+        """按种子生成（或从缓存读取）指定关卡的地图（也在预生成线程中调用）"""
+        game_map = GameMap(level=level, seed=seed, level_cache=self.level_cache, save_to_cache=False)
+        if self.level_cache is not None and not game_map.from_cache:
+            if cancelled is None or not cancelled.is_set():
+                self.level_cache.save(game_map.to_level_record())
+        return game_map
+    
     def initialize_game_map(self):
-        """初始化游戏地图"""
+        """初始化游戏地图（优先使用后台预生成好的地图）"""
+        # 停止旧地图的后台任务和自动行走
+        if getattr(self, 'game_map', None) is not None:
+            self.game_map.shutdown()
+        self.travel_target = None
         try:
-            self.game_map = GameMap(level=self.current_level)
+            game_map = self.level_prefetcher.take(self.current_level)
+            if game_map is None:
+                game_map = self.build_level_map(self.current_level, self.level_seed(self.current_level))
+            if RAY_TABLE_MODE is not None:
+                game_map.enable_ray_table(eager=RAY_TABLE_MODE == RAY_TABLE_EAGER)
+            self.game_map = game_map
             if hasattr(self, 'fp_view') and self.fp_view is not None:
                 self.fp_view.game_map = self.game_map
             if hasattr(self, 'minimap') and self.minimap is not None:
@@ -107,6 +167,9 @@ class RPGGame(QMainWindow):
                 self.fp_view.game_map = self.game_map
             if hasattr(self, 'minimap') and self.minimap is not None:
                 self.minimap.game_map = self.game_map
+        self.monster_ai = MonsterAI(self.game_map, seed=self.game_map.seed) if ROAMING_MONSTERS else None
+        # 当前关卡就绪后立即开始准备下一关
+        self.level_prefetcher.prefetch(self.current_level + 1, self.level_seed(self.current_level + 1))
 
     def setup_main_game_ui(self):
         """设置主游戏界面UI"""
@@ -125,6 +188,9 @@ class RPGGame(QMainWindow):
         
         # 第一人称视图区域
         self.fp_view = FirstPersonView(self.game_map, self)
+        self.fp_view.set_quality_governor(RenderQualityGovernor(budget_ms=FRAME_BUDGET_MS))
+        self.fp_view.profiler = self.profiler
+        self.fp_view.async_rays = ASYNC_RAY_COMPUTE
         game_layout.addWidget(self.fp_view, 5)
         
         # ===== 右侧UI区域 =====
@@ -240,6 +306,7 @@ class RPGGame(QMainWindow):
         minimap_label.setStyleSheet("font-weight: bold; font-family: 'Microsoft YaHei'; color: white;")
         self.minimap = MinimapWidget(self.game_map)
         self.minimap.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.minimap.profiler = self.profiler
         minimap_layout.addWidget(minimap_label)
         minimap_layout.addWidget(self.minimap)
         
@@ -279,6 +346,23 @@ class RPGGame(QMainWindow):
         self.monster_list.setWordWrap(True)
         dev_info_layout.addWidget(self.monster_list)
         
+        # 渲染统计
+        self.render_stats = QLabel("")
+        self.render_stats.setStyleSheet("color: #88ccff; font-size: 12px; font-family: 'Microsoft YaHei';")
+        self.render_stats.setWordWrap(True)
+        dev_info_layout.addWidget(self.render_stats)
+        
+        # 性能分析叠加层
+        self.profiler_toggle = QCheckBox("显示性能分析")
+        self.profiler_toggle.setStyleSheet("color: #aaa; font-family: 'Microsoft YaHei';")
+        self.profiler_toggle.stateChanged.connect(self.toggle_profiler_overlay)
+        dev_info_layout.addWidget(self.profiler_toggle)
+        self.profiler_overlay = QLabel("")
+        self.profiler_overlay.setStyleSheet("color: #99ff99; font-size: 11px; font-family: 'Consolas', 'Microsoft YaHei';")
+        self.profiler_overlay.setWordWrap(True)
+        self.profiler_overlay.setVisible(False)
+        dev_info_layout.addWidget(self.profiler_overlay)
+        
         # 添加作弊功能到开发者模式UI
         if DEV_MODE_ENABLED:
             self.add_cheat_buttons(dev_info_layout)
@@ -356,6 +440,9 @@ class RPGGame(QMainWindow):
         self.player_dir = 0
         self.teleport_mode = False
         self.player_died = False
+        # 新的一局使用新种子，之前预生成的关卡作废
+        self.run_seed = self.new_run_seed()
+        self.level_prefetcher.discard()
         
         # 生成新地图
         self.initialize_game_map()
@@ -388,9 +475,13 @@ class RPGGame(QMainWindow):
             # 传送到点击位置
             self.game_map.player_x = float(x)
             self.game_map.player_y = float(y)
+            self.game_map.update_fov()
             self.update_ui()
             self.teleport_mode = False
             self.log_message(f"已传送到 ({x}, {y})")
+        elif not self.in_battle:
+            # 自动行走到点击的格子
+            self.start_travel((x, y))
     
     def add_cheat_buttons(self, layout):
         """添加作弊功能按钮到开发者模式UI"""
@@ -402,6 +493,7 @@ class RPGGame(QMainWindow):
             ("最大MP", self.max_mp),
             ("添加道具", self.add_items),
             ("传送地图", self.toggle_teleport_mode),
+            ("揭开迷雾", self.reveal_map),
             ("添加Boss", self.add_boss),
             ("无敌模式", self.toggle_god_mode)
         ]
@@ -413,6 +505,12 @@ class RPGGame(QMainWindow):
             btn.clicked.connect(func)
             layout.addWidget(btn)
     
+    def reveal_map(self):
+        """揭开整张地图的迷雾"""
+        self.game_map.reveal_all()
+        self.minimap.render()
+        self.log_message("已揭开整张地图")
+    
     def toggle_teleport_mode(self):
         """切换传送模式"""
         self.teleport_mode = not self.teleport_mode
@@ -430,8 +528,8 @@ class RPGGame(QMainWindow):
     
     def clear_enemies(self):
         """清空所有敌人"""
-        for enemy in self.game_map.enemies:
-            enemy.active = False
+        if self.game_map.defeat_all_enemies():
+            self.minimap.render()
         self.log_message("所有敌人已被清除")
     
     def full_heal(self):
@@ -461,8 +559,7 @@ class RPGGame(QMainWindow):
             return
         
         # 检查是否已经有Boss
-        boss_count = sum(1 for enemy in self.game_map.enemies if enemy.is_boss)
-        if boss_count > 0:
+        if self.game_map.enemies.count_active_bosses() > 0:
             self.log_message("当前地图已有Boss")
             return
         
@@ -499,28 +596,55 @@ class RPGGame(QMainWindow):
         global DEV_MODE_ENABLED
         DEV_MODE_ENABLED = (state == Qt.CheckState.Checked.value)
         self.dev_info_frame.setVisible(DEV_MODE_ENABLED)
+        self.profiler.enabled = DEV_MODE_ENABLED
         if DEV_MODE_ENABLED:
             self.update_dev_info()
     
+    def toggle_profiler_overlay(self, state):
+        """切换性能分析叠加层"""
+        self.profiler_overlay.setVisible(state == Qt.CheckState.Checked.value)
+        self.update_dev_info()
+    
     def update_dev_info(self):
         """更新开发者模式信息"""
         if not DEV_MODE_ENABLED:
             return
             
-        # 更新怪物列表
+        # 更新怪物列表（Boss在前，敌人很多时只列出前 DEV_MONSTER_LIST_LIMIT 个）
+        enemies = self.game_map.enemies
+        alive = enemies.active_indices(boss=True) + enemies.active_indices(boss=False)
         monster_list = []
-        for enemy in self.game_map.enemies:
-            if enemy.active:
-                # 根据是否为Boss添加不同颜色
-                if enemy.is_boss:
-                    monster_list.append(f"• <span style='color: #ff5555;'>{enemy.enemy.name}</span> (x:{enemy.x}, y:{enemy.y})")
-                else:
-                    monster_list.append(f"• {enemy.enemy.name} (x:{enemy.x}, y:{enemy.y})")
+        for index in alive[:DEV_MONSTER_LIST_LIMIT]:
+            enemy = enemies.view(index)
+            # 根据是否为Boss添加不同颜色
+            if enemy.is_boss:
+                monster_list.append(f"• <span style='color: #ff5555;'>{enemy.name}</span> (x:{enemy.x}, y:{enemy.y})")
+            else:
+                monster_list.append(f"• {enemy.name} (x:{enemy.x}, y:{enemy.y})")
+        if len(alive) > DEV_MONSTER_LIST_LIMIT:
+            monster_list.append(f"• ……共 {len(alive)} 个怪物")
         
         if not monster_list:
             monster_list.append("• 没有生成的怪物")
         
         self.monster_list.setText("\n".join(monster_list))
+        
+        # 更新渲染统计
+        render_stats = [self.fp_view.frame_cache.stats_text()]
+        if self.game_map.seed is not None:
+            render_stats.insert(0, f"种子: {self.run_seed} / 本关 {self.game_map.seed:016x}")
+        if self.fp_view.quality_governor is not None:
+            render_stats.append(self.fp_view.quality_governor.stats_text())
+        if self.monster_ai is not None:
+            render_stats.append(self.monster_ai.stats_text())
+        if self.game_map.ray_table is not None:
+            ray_table = self.game_map.ray_table
+            render_stats.append(f"射线表: {len(ray_table)} 个视角 {ray_table.memory_bytes() / 1024:.0f}KB")
+        self.render_stats.setText("\n".join(render_stats))
+        
+        # 更新性能分析叠加层
+        if self.profiler_overlay.isVisible():
+            self.profiler_overlay.setText("\n".join(self.profiler.summary_lines()))
     
     def set_dark_theme(self):
         """设置深色主题"""
@@ -584,6 +708,11 @@ class RPGGame(QMainWindow):
             self.set_view_direction_immediate(270)  # 西（朝左）
             event.accept()
             return
+        # 自动行走到出口
+        elif key == Qt.Key.Key_T:
+            self.start_travel(self.game_map.exit_point)
+            event.accept()
+            return
         # 其他控制
         elif key == Qt.Key.Key_E:
             if hasattr(self.fp_view, 'show_exit_prompt') and self.fp_view.show_exit_prompt:
@@ -623,12 +752,17 @@ class RPGGame(QMainWindow):
         # 更新小地图
         self.minimap.render()
     
+    @profiled("process_movement")
     def process_movement(self):
         """处理WASD移动逻辑 - 基于视角方向"""
         if self.in_battle:
             return
             
         current_time = QTime.currentTime().msecsSinceStartOfDay()
+        if self.monster_ai is not None:
+            self.update_monsters(current_time)
+            if self.in_battle:
+                return
         if current_time - self.last_move_time < self.move_cooldown:
             return
             
@@ -674,12 +808,72 @@ class RPGGame(QMainWindow):
             elif direction == 270: # L (西/左)
                 dx -= 0.1
         
+        # 没有按移动键时沿距离场自动行走，按下任意移动键即取消
+        if self.travel_target is not None:
+            if any(self.keys_pressed.values()):
+                self.travel_target = None
+            else:
+                dx, dy = self.travel_step()
+        
         # 执行移动
         if dx != 0 or dy != 0:
             if self.game_map.move_player(dx, dy):
+                # 跨越格子边界时更新探索区域
+                self.game_map.update_fov()
                 self.check_pickup_available()
                 self.update_ui()
                 self.last_move_time = current_time
+            else:
+                self.travel_target = None
+    
+    @profiled("monster_ai")
+    def update_monsters(self, now):
+        """推进怪物AI，怪物走到玩家所在格子时开始战斗"""
+        px, py = int(self.game_map.player_x), int(self.game_map.player_y)
+        changed = self.monster_ai.update(now, (px, py))
+        if not changed:
+            return
+        self.game_map.mark_changed(*changed)
+        enemy_spot = self.game_map.get_enemy_at(px, py)
+        if enemy_spot:
+            self.start_battle(enemy_spot)
+            return
+        self.minimap.render()
+        # 每批移动后立即处理，避免玩家长时间不动时变化记录溢出而清空整个帧缓存
+        self.fp_view.sync_entity_changes()
+        if any(abs(x - px) <= MAX_DIST and abs(y - py) <= MAX_DIST for x, y in changed):
+            self.fp_view.render_view()
+    
+    def start_travel(self, target):
+        """开始自动行走到target格子（只能前往已探索的格子，并且只经过已探索的格子）"""
+        x, y = target
+        if not self.game_map.is_explored(x, y):
+            self.log_message("只能前往已探索的区域。")
+            return
+        if self.game_map.is_wall(x, y):
+            self.log_message("无法前往墙壁。")
+            return
+        field = self.flow_fields.get(self.game_map, target)
+        if field.distance(int(self.game_map.player_x), int(self.game_map.player_y)) == UNREACHABLE:
+            self.log_message("无法经过已探索的区域到达该位置。")
+            return
+        self.travel_target = (x, y)
+        self.travel_field = field
+        self.setFocus()
+    
+    def travel_step(self):
+        """自动行走的下一步移动量，已到达终点时结束自动行走"""
+        field = self.travel_field
+        px, py = int(self.game_map.player_x), int(self.game_map.player_y)
+        next_cell = field.next_step(px, py)
+        if next_cell is None:
+            self.travel_target = None
+            return 0, 0
+        step_x, step_y = next_cell[0] - px, next_cell[1] - py
+        direction = TRAVEL_DIRECTIONS[(step_x, step_y)]
+        if direction != self.player_dir:
+            self.set_view_direction_immediate(direction)
+        return step_x * self.move_speed, step_y * self.move_speed
     
     def check_pickup_available(self):
         x, y = int(self.game_map.player_x), int(self.game_map.player_y)
@@ -714,7 +908,7 @@ class RPGGame(QMainWindow):
                 return
             
             # 检查是否有敌人
-            if any(e.active for e in self.game_map.enemies):
+            if self.game_map.active_enemy_count() > 0:
                 self.log_message("还有敌人未被击败！请清除所有敌人再进入下一关。")
                 return
             
@@ -735,6 +929,7 @@ class RPGGame(QMainWindow):
             self.fp_view.player_dir = 0
             self.update_ui()
     
+    @profiled("update_ui")
     def update_ui(self):
         self.hp_label.setText(f"❤️ HP: {self.player.hp}/{self.player.max_hp}")
         self.mp_label.setText(f"💙 MP: {self.player.mp}/{self.player.max_mp}")
@@ -747,11 +942,9 @@ class RPGGame(QMainWindow):
             if enemy_spot:
                 self.start_battle(enemy_spot)
         else:
-            self.fp_view.scene().clear()
             # 使用高对比度的黄色
-            text_item = self.fp_view.scene().addText(f"⚔️ 与 {self.current_enemy.name} 战斗中！", 
-                                                   QFont("Microsoft YaHei", 20))
-            text_item.setDefaultTextColor(QColor(255, 255, 0))
+            self.fp_view.show_message(f"⚔️ 与 {self.current_enemy.name} 战斗中！", 
+                                      QFont("Microsoft YaHei", 20), QColor(255, 255, 0))
             
             # 战斗中更新敌人UI
             self.enemy_ui.update_enemy(
@@ -790,6 +983,7 @@ class RPGGame(QMainWindow):
     def start_battle(self, enemy_spot):
         """开始战斗，传入EnemySpot对象"""
         self.in_battle = True
+        self.travel_target = None
         self.current_enemy_spot = enemy_spot
         # 根据类型获取敌人
         self.current_enemy = create_monster(enemy_spot.enemy_type)
@@ -935,137 +1129,21 @@ class RPGGame(QMainWindow):
         safe_x, safe_y = self.find_safe_position_after_flee()
         current_x = int(self.game_map.player_x)
         current_y = int(self.game_map.player_y)
+        if (safe_x, safe_y) == (current_x, current_y):
+            return
         
-        # 计算移动向量
-        dx = (safe_x - current_x) * 0.5
-        dy = (safe_y - current_y) * 0.5
-        
-        # 限制移动距离
-        max_move = 1.5
-        distance = math.sqrt(dx*dx + dy*dy)
-        if distance > max_move and distance > 0:
-            dx = dx * max_move / distance
-            dy = dy * max_move / distance
-        
-        # 执行移动
-        if self.game_map.move_player(dx, dy):
-            self.log_message(f"成功逃跑到安全位置: ({int(self.game_map.player_x)}, {int(self.game_map.player_y)})")
-            self.update_ui()
+        # 沿可到达的路径逃到目标格子（保持格子内的相对位置）
+        self.game_map.player_x += safe_x - current_x
+        self.game_map.player_y += safe_y - current_y
+        self.game_map.update_fov()
+        self.log_message(f"成功逃跑到安全位置: ({safe_x}, {safe_y})")
+        self.update_ui()
     
     def find_safe_position_after_flee(self):
         """寻找一个安全的逃跑位置"""
-        current_x = int(self.game_map.player_x)
-        current_y = int(self.game_map.player_y)
-        map_size = self.game_map.size
-        
-        # 定义最大搜索范围
-        max_search_range = 5
-        
-        # 存储候选安全位置
-        safe_positions = []
-        
-        # 搜索周围的格子
-        for dx in range(-max_search_range, max_search_range + 1):
-            for dy in range(-max_search_range, max_search_range + 1):
-                nx, ny = current_x + dx, current_y + dy
-                
-                # 检查边界
-                if nx < 1 or nx >= map_size - 1 or ny < 1 or ny >= map_size - 1:
-                    continue
-                
-                # 检查是否是墙
-                if self.game_map.is_wall(nx, ny):
-                    continue
-                
-                # 检查是否有敌人
-                has_enemy = False
-                for enemy in self.game_map.enemies:
-                    if enemy.active and enemy.x == nx and enemy.y == ny:
-                        has_enemy = True
-                        break
-                
-                if has_enemy:
-                    continue
-                
-                # 检查是否有Boss
-                has_boss = False
-                for enemy in self.game_map.enemies:
-                    if enemy.active and enemy.is_boss and enemy.x == nx and enemy.y == ny:
-                        has_boss = True
-                        break
-                
-                if has_boss:
-                    continue
-                
-                # 计算与当前位置的距离和方向
-                distance = math.sqrt(dx*dx + dy*dy)
-                direction = math.atan2(dy, dx)
-                
-                # 优先选择距离适中、远离敌人的位置
-                safe_positions.append((nx, ny, distance, direction))
-        
-        # 按距离排序
-        safe_positions.sort(key=lambda x: x[2])
-        
-        if safe_positions:
-            # 选择最接近的3个安全位置
-            candidate_positions = safe_positions[:min(3, len(safe_positions))]
-            
-            # 优先选择与当前敌人位置相反方向的位置
-            if self.current_enemy_spot:
-                enemy_x, enemy_y = self.current_enemy_spot.x, self.current_enemy_spot.y
-                enemy_dx = enemy_x - current_x
-                enemy_dy = enemy_y - current_y
-                enemy_direction = math.atan2(enemy_dy, enemy_dx)
-                opposite_direction = (enemy_direction + math.pi) % (2 * math.pi)
-                
-                # 选择最接近相反方向的位置
-                best_pos = min(candidate_positions, 
-                              key=lambda x: abs(x[3] - opposite_direction))
-                return best_pos[0], best_pos[1]
-            
-            # 随机选择一个候选位置
-            chosen_pos = random.choice(candidate_positions)
-            return chosen_pos[0], chosen_pos[1]
-        
-        # 没有找到安全位置，尝试使用简单的随机位置
-        return self.find_fallback_position(current_x, current_y)
-    
-    def find_fallback_position(self, current_x, current_y):
-        """当找不到安全位置时的备选方案"""
-        map_size = self.game_map.size
-        possible_positions = []
-        
-        # 检查所有相邻位置
-        for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0),  # 上右下左
-                       (-1, -1), (1, -1), (1, 1), (-1, 1)]:  # 四个对角线
-            nx, ny = current_x + dx, current_y + dy
-            
-            # 检查边界
-            if nx < 1 or nx >= map_size - 1 or ny < 1 or ny >= map_size - 1:
-                continue
-            
-            # 检查是否是墙
-            if self.game_map.is_wall(nx, ny):
-                continue
-            
-            # 检查是否有敌人
-            has_enemy = False
-            for enemy in self.game_map.enemies:
-                if enemy.active and enemy.x == nx and enemy.y == ny:
-                    has_enemy = True
-                    break
-            
-            if has_enemy:
-                continue
-            
-            possible_positions.append((nx, ny))
-        
-        if possible_positions:
-            return random.choice(possible_positions)
-        
-        # 作为最后的备选，返回当前位置
-        return current_x, current_y
+        current = (int(self.game_map.player_x), int(self.game_map.player_y))
+        target = plan_flee(self.game_map.danger_field(), self.game_map.cells, self.game_map.stride, current)
+        return target if target is not None else current
     
     def end_battle(self, victory):
         """结束战斗，清理所有战斗相关状态"""
@@ -1219,6 +1297,15 @@ class RPGGame(QMainWindow):
         if self.in_battle and self.current_enemy and self.current_enemy.is_alive():
             self.enemy_turn()
     
+    def closeEvent(self, event):
+        """退出时停止后台任务，并在开发者模式下导出性能数据"""
+        self.fp_view.shutdown()
+        self.level_prefetcher.shutdown()
+        self.game_map.shutdown()
+        if DEV_MODE_ENABLED and self.profiler.has_samples():
+            self.profiler.export_json(PROFILE_EXPORT_PATH)
+        super().closeEvent(event)
+    
     def log_message(self, msg):
         """显示消息提示"""
         # 确保msg是字符串类型
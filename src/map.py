@@ -1,24 +1,54 @@
-import os
-import sys
-import json
 import random
-from pathlib import Path
-from .systems.utils import generate_perfect_maze, ensure_connectivity
-from .systems.monsters import create_monster, get_monster_types, get_boss_config, get_config_path, get_boss_types
-import math
+import numpy as np
+from .systems.utils import generate_maze_cells, repair_connectivity
+from .systems.monsters import create_monster, get_monster_types, get_boss_config, get_boss_types
+from .systems.ray_table import RayHitTable, RAY_TABLE_EAGER
+from .systems.fov import compute_fov
+from .systems.level_cache import LevelRecord
+from .systems.spawn_planner import SpawnPlanner
+from .systems.entity_store import EnemyStore
+from .systems.danger_field import DangerField
 
 WALL = 1
 EMPTY = 0
 
-class EnemySpot:
-    def __init__(self, x, y, enemy_type):
-        self.x = x
-        self.y = y
-        self.enemy_type = enemy_type
-        self.enemy = create_monster(enemy_type)
-        self.active = True
-        # 检查是否为Boss
-        self.is_boss = hasattr(self.enemy, 'is_boss') and self.enemy.is_boss
+CHANGE_LOG_LIMIT = 1024  # 变化记录最多保留的条数，超出后丢弃较早的一半
+FOV_RADIUS = 6  # 探索视野半径（格）
+SPAWN_MIN_PLAYER_DIST = 3  # 敌人和道具与玩家起点的最小距离（格）
+
+class ChangeLog:
+    """
+    发生变化的格子记录，读取方保存序号，之后只取该序号以后的变化
+
+    超过 CHANGE_LOG_LIMIT 条时丢弃较早的一半，读取位置已被丢弃时返回None（调用方需要完全刷新）
+    """
+    def __init__(self):
+        self._cells = []
+        self._base = 0  # _cells[0] 对应的记录序号
+
+    def append(self, cells):
+        """追加发生变化的格子，cells 为空表示整张地图都需要刷新"""
+        if cells:
+            self._cells.extend(cells)
+        else:
+            self._cells.append(None)
+        if len(self._cells) > CHANGE_LOG_LIMIT:
+            drop = len(self._cells) // 2
+            del self._cells[:drop]
+            self._base += drop
+
+    def position(self):
+        """当前记录的末尾序号"""
+        return self._base + len(self._cells)
+
+    def since(self, position):
+        """某个序号之后发生变化的格子列表，记录已被丢弃或包含整张地图的变化时返回None"""
+        if position < self._base:
+            return None
+        cells = self._cells[position - self._base:]
+        if None in cells:
+            return None
+        return cells
 
 class ItemSpot:
     def __init__(self, x, y, item):
@@ -28,59 +58,195 @@ class ItemSpot:
         self.active = True
 
 class GameMap:
-    def __init__(self, size=11, level=1):
+    def __init__(self, size=11, level=1, ray_table_mode=None, fog_of_war=True, seed=None, level_cache=None,
+                 save_to_cache=True):
+        """
+        seed: 本关的随机种子，相同种子生成完全相同的关卡（None 表示每次随机）
+        level_cache: LevelCache 实例，指定种子时优先从磁盘读取已生成的关卡
+        save_to_cache: 新生成的关卡是否写入 level_cache（False 时由调用方决定是否写入）
+        """
         self.size = size
         # 确保大小为奇数
         if size % 2 == 0:
             size += 1
             self.size = size
-            
-        # 生成并确保连通性
-        self.grid = generate_perfect_maze(size)
-        self.grid = ensure_connectivity(self.grid)        
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        record = None
+        if level_cache is not None and seed is not None:
+            record = level_cache.load(seed, level, size)
+        self.from_cache = record is not None
+        if record is not None:
+            self.load_cells(record.size, record.cells)
+            self.connectivity_report = None  # 缓存中的关卡在生成时已修复连通性
+        else:
+            # 生成并确保连通性
+            size, cells = generate_maze_cells(size, self.rng)
+            self.load_cells(size, cells)
+            self.connectivity_report = repair_connectivity(self.grid)
         self.player_x = 1.0
         self.player_y = 1.0
-        self.enemies = []
-        self.items = []
+        self.clear_entities()
         self.exit_point = (size-2, size-2)
         self.level = level
         self.boss_present = False
         self.is_boss_level = self.level % 10 == 0 and self.level > 0
+        # 地图内容版本号，整张地图需要刷新时递增（用于渲染缓存键）；
+        # 敌人/道具的局部变化不改变版本号，只写入变化记录，由渲染方按位置失效
+        self.version = 0
+        # 变化记录：内容或探索状态发生变化的格子（小地图），以及只记录敌人/道具变化的格子（第一人称视图）
+        self._changes = ChangeLog()
+        self._entity_changes = ChangeLog()
+        
+        if record is not None:
+            self.apply_level_record(record)
+        else:
+            self.generate_content()
+            if save_to_cache and level_cache is not None and seed is not None:
+                level_cache.save(self.to_level_record())
+        
+        # 战争迷雾：每个格子一个字节，1表示已探索
+        self.fog_of_war = fog_of_war
+        self.explored = bytearray(size * size)
+        self.explored_version = 0  # 探索范围扩大时递增
+        self._fov_cell = None
+        if fog_of_war:
+            self.update_fov()
+        else:
+            self.reveal_all()
         
-        self.generate_content()
+        # 可选的射线命中表（"lazy" 按需计算，"eager" 后台预计算）
+        self.ray_table = None
+        if ray_table_mode is not None:
+            self.enable_ray_table(eager=ray_table_mode == RAY_TABLE_EAGER)
+
+    def load_cells(self, size, cells):
+        """
+        载入按行展开的地图数据（每格一个字节）
+
+        地图保存在一块连续的缓冲区中，四周填充一圈墙壁（边长 size + 2），
+        grid 是指向缓冲区各行的 memoryview 列表，grid[y][x] 的读写与原来的行列表相同
+        """
+        self.size = size
+        self.stride = size + 2
+        self.cells = bytearray([WALL]) * (self.stride * self.stride)
+        for y in range(size):
+            row_start = (y + 1) * self.stride + 1
+            self.cells[row_start:row_start + size] = cells[y * size:(y + 1) * size]
+        view = memoryview(self.cells)
+        self.grid = [view[(y + 1) * self.stride + 1:(y + 1) * self.stride + 1 + size] for y in range(size)]
+
+    def cells_view(self):
+        """整块地图缓冲区（含边界填充）的只读 memoryview"""
+        return memoryview(self.cells).toreadonly()
+
+    def grid_array(self):
+        """地图缓冲区（含边界填充）的NumPy uint8数组视图，形状为 (size + 2, size + 2)，不复制数据"""
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.stride, self.stride)
+
+    def enable_ray_table(self, num_rays=120, eager=False):
+        """启用射线命中表，渲染时查表代替射线投射"""
+        if self.ray_table is None or self.ray_table.num_rays != num_rays:
+            self.shutdown()
+            self.ray_table = RayHitTable(self, num_rays)
+        if eager:
+            self.ray_table.start_background_fill()
+        return self.ray_table
+
+    def shutdown(self):
+        """停止地图相关的后台任务（切换地图前调用）"""
+        if getattr(self, 'ray_table', None) is not None:
+            self.ray_table.stop()
+
+    def mark_changed(self, *cells):
+        """标记敌人/道具发生变化，cells 为发生变化的格子坐标（不指定表示整张地图，同时递增版本号）"""
+        if not cells:
+            self.version += 1
+        self._changes.append(cells)
+        self._entity_changes.append(cells)
+
+    def _log_changes(self, cells):
+        """记录探索状态发生变化的格子（不影响第一人称视图）"""
+        self._changes.append(cells)
+
+    def change_position(self):
+        """当前变化记录的末尾序号，供 changes_since 使用"""
+        return self._changes.position()
+
+    def changes_since(self, position):
+        """
+        返回某个序号之后内容或探索状态发生变化的格子列表
+
+        记录已被丢弃或包含整张地图的变化时返回None，调用方需要完全刷新
+        """
+        return self._changes.since(position)
+
+    def entity_change_position(self):
+        """敌人/道具变化记录的末尾序号，供 entity_changes_since 使用"""
+        return self._entity_changes.position()
+
+    def entity_changes_since(self, position):
+        """返回某个序号之后敌人/道具发生变化的格子列表（需要完全刷新时返回None）"""
+        return self._entity_changes.since(position)
+
+    def to_level_record(self):
+        """把当前关卡的地图和初始实体导出为 LevelRecord（用于写入关卡缓存）"""
+        cells = b"".join(bytes(row) for row in self.grid)
+        enemies = [(e.x, e.y, e.enemy_type, e.is_boss) for e in self.enemies if e.active]
+        items = [(i.x, i.y, i.item.name) for i in self.items if i.active]
+        return LevelRecord(self.size, self.seed, self.level, cells, self.exit_point, enemies, items)
+
+    def apply_level_record(self, record):
+        """按 LevelRecord 重建关卡实体（道具按名称从当前道具配置中查找）"""
+        from .systems.items import create_items
+        items_by_name = {item.name: item for item in create_items()}
+        self.exit_point = record.exit_point
+        self.clear_entities()
+        for x, y, enemy_type, is_boss in record.enemies:
+            self.add_enemy(x, y, enemy_type, is_boss)
+            if is_boss:
+                self.boss_present = True
+        for x, y, item_name in record.items:
+            item = items_by_name.get(item_name)
+            if item is None:
+                print(f"警告：关卡缓存中的道具 {item_name} 不在道具配置中")
+                continue
+            self.add_item(ItemSpot(x, y, item))
 
     def generate_content(self):
         """根据关卡类型生成内容"""
+        # 起点和出口不放置实体，敌人和道具也不会离玩家起点太近
+        planner = SpawnPlanner(self.grid, self.rng, exclude=((1, 1), self.exit_point),
+                               keep_away=(1, 1), min_distance=SPAWN_MIN_PLAYER_DIST)
         if self.is_boss_level:
-            self.generate_boss_level()
+            self.generate_boss_level(planner)
         else:
-            self.generate_normal_level()
+            self.generate_normal_level(planner)
 
-    def generate_boss_level(self):
+    def generate_boss_level(self, planner):
         """生成Boss关卡内容（只生成Boss，不生成普通敌人）"""
         # 清空现有内容
-        self.enemies = []
-        self.items = []
+        self.clear_entities()
         
         # 生成Boss
-        self.generate_bosses()
+        self.generate_bosses(planner)
         
         # 生成少量道具（Boss关卡）
-        self.generate_items_for_boss_level()
+        self.generate_items_for_boss_level(planner)
 
-    def generate_normal_level(self):
+    def generate_normal_level(self, planner):
         """生成普通关卡内容（不生成Boss）"""
         # 清空现有内容
-        self.enemies = []
-        self.items = []
+        self.clear_entities()
         
         # 生成普通敌人
-        self.generate_normal_enemies()
+        self.generate_normal_enemies(planner)
         
         # 生成道具
-        self.generate_items_for_normal_level()
+        self.generate_items_for_normal_level(planner)
 
-    def generate_bosses(self):
+    def generate_bosses(self, planner):
         """生成随机Boss，数量和类型由配置决定"""
         # 获取所有符合条件的Boss
         available_bosses = self.get_available_bosses()
@@ -91,12 +257,13 @@ class GameMap:
             return
         
         # 随机选择一个Boss
-        selected_boss = random.choice(available_bosses)
+        selected_boss = self.rng.choice(available_bosses)
         
         # 在出口附近添加Boss
         boss_x, boss_y = self.find_boss_position()
         if boss_x is not None and boss_y is not None:
-            self.enemies.append(EnemySpot(boss_x, boss_y, selected_boss['type']))
+            planner.reserve((boss_x, boss_y))
+            self.add_enemy(boss_x, boss_y, selected_boss['type'], is_boss=True)
             self.boss_present = True
             print(f"Boss关卡{self.level}生成: {selected_boss['name']} at ({boss_x}, {boss_y})")
         else:
@@ -139,7 +306,7 @@ class GameMap:
         
         return None, None
 
-    def generate_normal_enemies(self):
+    def generate_normal_enemies(self, planner):
         """生成普通敌人（不包括Boss）"""
         monster_types = get_monster_types()
         
@@ -147,55 +314,80 @@ class GameMap:
         num_enemies = min(3 + self.level//3, 8)
         
         for _ in range(num_enemies):
-            while True:
-                x = random.randint(1, self.size - 2)
-                y = random.randint(1, self.size - 2)
-                if self.grid[y][x] == EMPTY and (x, y) != (1, 1) and (x, y) != self.exit_point:
-                    # 随机选择普通怪物类型
-                    enemy_type = random.choice(monster_types)
-                    self.enemies.append(EnemySpot(x, y, enemy_type))
-                    break
-
-    def generate_items_for_normal_level(self):
+            cell = planner.take()
+            if cell is None:
+                print(f"警告：第{self.level}关没有足够的空地放置敌人")
+                break
+            # 随机选择普通怪物类型
+            enemy_type = self.rng.choice(monster_types)
+            self.add_enemy(cell[0], cell[1], enemy_type)
+
+    def generate_items_for_normal_level(self, planner):
         """为普通关卡生成道具"""
-        from .systems.items import create_items
-        items = create_items()
-        
         # 计算道具数量（随关卡增加）
-        num_items = min(2 + self.level//4, 5)
-        
-        for _ in range(num_items):
-            while True:
-                x = random.randint(1, self.size - 2)
-                y = random.randint(1, self.size - 2)
-                if self.grid[y][x] == EMPTY and (x, y) != (1, 1) and (x, y) != self.exit_point:
-                    # 随机选择道具
-                    item = random.choice(items)
-                    self.items.append(ItemSpot(x, y, item))
-                    break
-
-    def generate_items_for_boss_level(self):
+        self.place_items(planner, min(2 + self.level//4, 5))
+
+    def generate_items_for_boss_level(self, planner):
         """为Boss关卡生成少量道具"""
+        # Boss关卡道具数量较少
+        self.place_items(planner, min(1 + self.level//10, 3))
+
+    def place_items(self, planner, num_items):
+        """从规划器取空地放置num_items个随机道具"""
         from .systems.items import create_items
         items = create_items()
         
-        # Boss关卡道具数量较少
-        num_items = min(1 + self.level//10, 3)
-        
         for _ in range(num_items):
-            while True:
-                x = random.randint(1, self.size - 2)
-                y = random.randint(1, self.size - 2)
-                if self.grid[y][x] == EMPTY and (x, y) != (1, 1) and (x, y) != self.exit_point:
-                    # 随机选择道具
-                    item = random.choice(items)
-                    self.items.append(ItemSpot(x, y, item))
-                    break
+            cell = planner.take()
+            if cell is None:
+                print(f"警告：第{self.level}关没有足够的空地放置道具")
+                break
+            # 随机选择道具
+            item = self.rng.choice(items)
+            self.add_item(ItemSpot(cell[0], cell[1], item))
 
-    def is_wall(self, x, y):
+    def update_fov(self, radius=FOV_RADIUS):
+        """
+        玩家跨越格子边界时，从玩家所在格子计算视野并标记为已探索
+
+        返回新探索到的格子列表（玩家仍在同一格子内时不做任何计算）
+        """
+        cell = (int(self.player_x), int(self.player_y))
+        if cell == self._fov_cell:
+            return []
+        self._fov_cell = cell
+
+        size = self.size
+        explored = self.explored
+        new_cells = []
+        for x, y in compute_fov(self.is_wall, cell[0], cell[1], radius):
+            if 0 <= x < size and 0 <= y < size and not explored[y * size + x]:
+                explored[y * size + x] = 1
+                new_cells.append((x, y))
+        if new_cells:
+            self.explored_version += 1
+            self._log_changes(new_cells)
+        return new_cells
+
+    def reveal_all(self):
+        """揭开整张地图"""
+        self.explored[:] = b'\x01' * len(self.explored)
+        self.explored_version += 1
+        self._log_changes(())
+
+    def is_explored(self, x, y):
         if 0 <= x < self.size and 0 <= y < self.size:
-            return self.grid[y][x] == WALL
-        return True
+            return self.explored[y * self.size + x] == 1
+        return False
+
+    def is_wall(self, x, y):
+        """
+        判断格子是否为墙壁
+
+        地图四周填充了一圈墙壁，-1 <= x, y <= size 范围内的坐标都不需要边界检查；
+        调用方需保证坐标不超出地图边界一格以上
+        """
+        return self.cells[(y + 1) * self.stride + x + 1] == WALL
 
     def move_player(self, dx, dy):
         nx, ny = self.player_x + dx, self.player_y + dy
@@ -204,35 +396,135 @@ class GameMap:
             return True
         return False
 
-    def get_enemy_at(self, x, y):
-        for e in self.enemies:
-            if e.x == x and e.y == y and e.active:
-                return e
+    def clear_entities(self):
+        """清空敌人、道具及其格子索引"""
+        # 敌人保存在结构数组中，遍历得到的是轻量视图，完整的Enemy对象按需创建
+        self.enemies = EnemyStore(create_monster)
+        self.items = []
+        # 格子索引：(x, y) -> 该格子上的实体列表（失效的实体在查询时跳过）
+        self._enemy_cells = {}
+        self._item_cells = {}
+        self._danger = None  # 危险度场，首次逃跑时建立
+
+    def add_enemy(self, x, y, enemy_type, is_boss=False):
+        """加入敌人并登记到格子索引，返回敌人视图"""
+        spot = self.enemies.add(x, y, enemy_type, is_boss)
+        self._enemy_cells.setdefault((x, y), []).append(spot)
+        if self._danger is not None:
+            self._danger.add_source((x, y))
+        return spot
+
+    def add_item(self, spot):
+        """加入道具并登记到格子索引"""
+        self.items.append(spot)
+        self._item_cells.setdefault((spot.x, spot.y), []).append(spot)
+        return spot
+
+    def move_enemy(self, spot, x, y):
+        """移动敌人并更新格子索引（不写变化记录，调用方在一批移动后统一 mark_changed）"""
+        old_cell = (spot.x, spot.y)
+        self._unindex(self._enemy_cells, spot)
+        self.enemies.move(spot.index, x, y)
+        self._enemy_cells.setdefault((x, y), []).append(spot)
+        if self._danger is not None:
+            self._danger.move_source(old_cell, (x, y))
+
+    def danger_field(self):
+        """每个格子到最近存活敌人的步数（首次调用时建立，之后随敌人出现、移动、被击败增量更新）"""
+        if self._danger is None:
+            sources = [(self.enemies.xs[i], self.enemies.ys[i]) for i in self.enemies.active_indices()]
+            self._danger = DangerField(self.cells, self.stride, sources)
+        return self._danger
+
+    @staticmethod
+    def _unindex(cells, spot):
+        """从格子索引中移除实体"""
+        spots = cells.get((spot.x, spot.y))
+        if spots is not None and spot in spots:
+            spots.remove(spot)
+            if not spots:
+                del cells[(spot.x, spot.y)]
+
+    @staticmethod
+    def _active_at(cells, x, y):
+        for spot in cells.get((x, y), ()):
+            if spot.active:
+                return spot
         return None
 
+    @staticmethod
+    def _active_in(cells, first_x, first_y, last_x, last_y):
+        """索引中位于矩形范围（含边界）内的有效实体，耗时与范围内格子数或实体格子数中较小者相关"""
+        if (last_x - first_x + 1) * (last_y - first_y + 1) > len(cells):
+            keys = [cell for cell in cells if first_x <= cell[0] <= last_x and first_y <= cell[1] <= last_y]
+        else:
+            keys = [(cx, cy) for cy in range(first_y, last_y + 1)
+                    for cx in range(first_x, last_x + 1) if (cx, cy) in cells]
+        return [spot for cell in keys for spot in cells[cell] if spot.active]
+
+    def active_enemy_count(self):
+        """仍然存活的敌人数量"""
+        return self.enemies.count_active()
+
+    def get_enemy_at(self, x, y):
+        return self._active_at(self._enemy_cells, x, y)
+
     def get_item_at(self, x, y):
-        for i in self.items:
-            if i.x == x and i.y == y and i.active:
-                return i
-        return None
+        return self._active_at(self._item_cells, x, y)
+
+    def enemies_in(self, first_x, first_y, last_x, last_y):
+        """矩形范围（含边界）内仍然存活的敌人"""
+        return self._active_in(self._enemy_cells, first_x, first_y, last_x, last_y)
+
+    def items_in(self, first_x, first_y, last_x, last_y):
+        """矩形范围（含边界）内尚未拾取的道具"""
+        return self._active_in(self._item_cells, first_x, first_y, last_x, last_y)
+
+    def enemies_near(self, x, y, radius):
+        """以 (x, y) 为中心、边长 2*radius+1 的正方形范围内仍然存活的敌人"""
+        return self.enemies_in(x - radius, y - radius, x + radius, y + radius)
+
+    def items_near(self, x, y, radius):
+        """以 (x, y) 为中心、边长 2*radius+1 的正方形范围内尚未拾取的道具"""
+        return self.items_in(x - radius, y - radius, x + radius, y + radius)
 
     def defeat_enemy(self, x, y):
         """标记敌人被击败"""
-        for e in self.enemies:
-            if e.x == x and e.y == y and e.active:
-                e.active = False
-                # 检查是否是Boss
-                if e.is_boss:
-                    self.boss_present = False
-                return True
-        return False
+        e = self.get_enemy_at(x, y)
+        if e is None:
+            return False
+        e.active = False
+        self._unindex(self._enemy_cells, e)
+        if self._danger is not None:
+            self._danger.remove_source((x, y))
+        # 检查是否是Boss
+        if e.is_boss:
+            self.boss_present = False
+        self.mark_changed((x, y))
+        return True
+
+    def defeat_all_enemies(self):
+        """击败所有敌人（作弊功能），返回被清除的格子列表"""
+        cleared = []
+        for index in self.enemies.active_indices():
+            x, y = self.enemies.xs[index], self.enemies.ys[index]
+            self.enemies.active[index] = 0
+            cleared.append((x, y))
+        self._enemy_cells = {}
+        self._danger = None
+        self.boss_present = False
+        if cleared:
+            self.mark_changed(*cleared)
+        return cleared
 
     def collect_item(self, x, y):
-        for i in self.items:
-            if i.x == x and i.y == y and i.active:
-                i.active = False
-                return i.item
-        return None
+        i = self.get_item_at(x, y)
+        if i is None:
+            return None
+        i.active = False
+        self._unindex(self._item_cells, i)
+        self.mark_changed((x, y))
+        return i.item
 
     def add_boss_at_exit(self):
         """在出口附近添加Boss，用于作弊功能"""
@@ -243,10 +535,10 @@ class GameMap:
             return False
         
         # 随机选择一个Boss
-        selected_boss = random.choice(available_bosses)
+        selected_boss = self.rng.choice(available_bosses)
         
         # 检查是否已经有Boss
-        boss_count = sum(1 for enemy in self.enemies if enemy.is_boss)
+        boss_count = self.enemies.count_active_bosses()
         if boss_count >= selected_boss.get('max_occurrences', 1):
             print(f"无法在出口添加Boss: 已达到最大数量 {selected_boss.get('max_occurrences', 1)}")
             return False
@@ -260,11 +552,12 @@ class GameMap:
         # 确保Boss位置是空地
         if self.grid[boss_y][boss_x] == EMPTY:
             # 检查该位置是否已经有敌人
-            has_enemy = any(enemy.x == boss_x and enemy.y == boss_y for enemy in self.enemies)
+            has_enemy = self.get_enemy_at(boss_x, boss_y) is not None
             if not has_enemy:
-                self.enemies.append(EnemySpot(boss_x, boss_y, selected_boss['type']))
+                self.add_enemy(boss_x, boss_y, selected_boss['type'], is_boss=True)
                 print(f"成功在出口 ({boss_x}, {boss_y}) 添加Boss: {selected_boss['name']}")
                 self.boss_present = True
+                self.mark_changed((boss_x, boss_y))
                 return True
         
         # 找最近的空地
@@ -275,11 +568,12 @@ class GameMap:
                     if 1 <= nx < self.size-1 and 1 <= ny < self.size-1:
                         if self.grid[ny][nx] == EMPTY:
                             # 检查该位置是否已经有敌人
-                            has_enemy = any(enemy.x == nx and enemy.y == ny for enemy in self.enemies)
+                            has_enemy = self.get_enemy_at(nx, ny) is not None
                             if not has_enemy:
-                                self.enemies.append(EnemySpot(nx, ny, selected_boss['type']))
+                                self.add_enemy(nx, ny, selected_boss['type'], is_boss=True)
                                 print(f"成功在出口附近 ({nx}, {ny}) 添加Boss: {selected_boss['name']}")
                                 self.boss_present = True
+                                self.mark_changed((nx, ny))
                                 return True
         
         print("无法在出口附近添加Boss: 无法找到合适的空地")
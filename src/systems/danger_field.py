@@ -0,0 +1,153 @@
+import heapq
+from array import array
+from collections import deque
+
+WALL = 1
+UNREACHABLE = -1
+
+FLEE_MAX_STEPS = 5  # 逃跑时最多走出的步数
+
+class DangerField:
+    """
+    危险度场：每个格子到最近存活敌人的步数（多源BFS）
+
+    同时记录每个格子的最近敌人（来源）。敌人出现时只向外松弛变近的格子，
+    敌人消失时只重算原本属于它的区域（从区域边界做一次小范围Dijkstra），
+    其他格子的距离不受影响，更新耗时与受影响区域大小相关，而与敌人总数无关
+    """
+    def __init__(self, cells, stride, sources=()):
+        self.cells = cells
+        self.stride = stride
+        self._dist = array('i', [UNREACHABLE]) * len(cells)
+        self._source = array('i', [UNREACHABLE]) * len(cells)
+        self._counts = {}  # 来源下标 -> 该格子上的敌人数
+        self._offsets = (1, -1, stride, -stride)
+
+        queue = deque()
+        for cell in sources:
+            index = self._index(cell)
+            self._counts[index] = self._counts.get(index, 0) + 1
+            if self._dist[index] != 0:
+                self._dist[index] = 0
+                self._source[index] = index
+                queue.append(index)
+        self._relax(queue)
+
+    def _index(self, cell):
+        return (cell[1] + 1) * self.stride + cell[0] + 1
+
+    def _relax(self, queue):
+        """从队列中的格子向外BFS，更新距离变短的格子（缓冲区四周是墙壁，不会越界）"""
+        dist, source, cells = self._dist, self._source, self.cells
+        while queue:
+            index = queue.popleft()
+            next_dist = dist[index] + 1
+            origin = source[index]
+            for offset in self._offsets:
+                neighbor = index + offset
+                if cells[neighbor] == WALL:
+                    continue
+                if dist[neighbor] == UNREACHABLE or next_dist < dist[neighbor]:
+                    dist[neighbor] = next_dist
+                    source[neighbor] = origin
+                    queue.append(neighbor)
+
+    def distance(self, x, y):
+        """(x, y) 到最近敌人的步数，没有可到达的敌人时返回 UNREACHABLE"""
+        return self._dist[(y + 1) * self.stride + x + 1]
+
+    def add_source(self, cell):
+        """敌人出现在cell"""
+        index = self._index(cell)
+        count = self._counts.get(index, 0)
+        self._counts[index] = count + 1
+        if count == 0:
+            self._dist[index] = 0
+            self._source[index] = index
+            self._relax(deque([index]))
+
+    def remove_source(self, cell):
+        """cell上的敌人消失（被击败或离开）"""
+        index = self._index(cell)
+        count = self._counts.get(index, 0)
+        if count > 1:
+            self._counts[index] = count - 1
+            return
+        if count == 0:
+            return
+        del self._counts[index]
+
+        dist, source, cells = self._dist, self._source, self.cells
+        # 收集原本以该敌人为最近来源的区域，并清空其距离
+        region = [index]
+        source[index] = UNREACHABLE
+        dist[index] = UNREACHABLE
+        i = 0
+        while i < len(region):
+            current = region[i]
+            i += 1
+            for offset in self._offsets:
+                neighbor = current + offset
+                if source[neighbor] == index:
+                    source[neighbor] = UNREACHABLE
+                    dist[neighbor] = UNREACHABLE
+                    region.append(neighbor)
+
+        # 区域边界外的格子距离不变，从它们出发重新填充区域
+        heap = []
+        for current in region:
+            for offset in self._offsets:
+                neighbor = current + offset
+                if cells[neighbor] != WALL and dist[neighbor] != UNREACHABLE:
+                    heap.append((dist[neighbor] + 1, current, source[neighbor]))
+        heapq.heapify(heap)
+        while heap:
+            d, current, origin = heapq.heappop(heap)
+            if dist[current] != UNREACHABLE and dist[current] <= d:
+                continue
+            dist[current] = d
+            source[current] = origin
+            for offset in self._offsets:
+                neighbor = current + offset
+                if cells[neighbor] != WALL and (dist[neighbor] == UNREACHABLE or d + 1 < dist[neighbor]):
+                    heapq.heappush(heap, (d + 1, neighbor, origin))
+
+    def move_source(self, old_cell, new_cell):
+        """敌人从old_cell移动到new_cell"""
+        self.add_source(new_cell)
+        self.remove_source(old_cell)
+
+def plan_flee(danger, cells, stride, start, max_steps=FLEE_MAX_STEPS):
+    """
+    选择逃跑目的地：从start出发max_steps步以内可到达的格子中，离最近敌人最远的一个
+
+    只做一次以start为中心的有界BFS，每个格子的危险度直接查表，耗时与敌人数量无关；
+    距离相同时选步数较少的格子。有敌人的格子（危险度为0）既不作为目的地，也不从中穿过，
+    除此之外没有可去的格子时返回None
+    """
+    start_index = (start[1] + 1) * stride + start[0] + 1
+    steps = {start_index: 0}
+    frontier = [start_index]
+    best = None
+    best_key = None
+    for step in range(1, max_steps + 1):
+        next_frontier = []
+        for index in frontier:
+            for offset in (1, -1, stride, -stride):
+                neighbor = index + offset
+                if neighbor in steps or cells[neighbor] == WALL:
+                    continue
+                steps[neighbor] = step
+                y, x = divmod(neighbor, stride)
+                safety = danger.distance(x - 1, y - 1)
+                if safety == 0:
+                    continue
+                next_frontier.append(neighbor)
+                if safety == UNREACHABLE:
+                    safety = len(cells)  # 无法到达任何敌人的格子最安全
+                key = (safety, -step)
+                if best_key is None or key > best_key:
+                    best_key = key
+                    best = (x - 1, y - 1)
+        frontier = next_frontier
+    return best
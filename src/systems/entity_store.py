@@ -0,0 +1,168 @@
+import copy
+from array import array
+import numpy as np
+from ..battle import Enemy
+
+class StoredEnemy(Enemy):
+    """
+    按需创建的敌人对象，属性复制自同类型的原型
+
+    hp 直接读写实体存储中的数组，存储中的批量操作和对象上的操作看到的是同一个值
+    """
+    def __init__(self, store, index, prototype):
+        state = copy.deepcopy(vars(prototype))
+        state.pop('hp', None)
+        self.__dict__.update(state)
+        self._store = store
+        self._index = index
+        self.is_boss = bool(store.boss[index])
+
+    @property
+    def hp(self):
+        return self._store.hps[self._index]
+
+    @hp.setter
+    def hp(self, value):
+        self._store.hps[self._index] = value
+
+class EnemyView:
+    """
+    实体存储中一个敌人的轻量视图，提供与原 EnemySpot 相同的属性
+
+    x、y、enemy_type、active、is_boss 直接读写存储中的数组；
+    enemy 在首次访问时才创建（大多数敌人在整关中都不需要完整的Enemy对象）
+    """
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def x(self):
+        return self.store.xs[self.index]
+
+    @property
+    def y(self):
+        return self.store.ys[self.index]
+
+    @property
+    def enemy_type(self):
+        return self.store.type_names[self.store.type_ids[self.index]]
+
+    @property
+    def active(self):
+        return self.store.active[self.index] == 1
+
+    @active.setter
+    def active(self, value):
+        self.store.active[self.index] = 1 if value else 0
+
+    @property
+    def is_boss(self):
+        return self.store.boss[self.index] == 1
+
+    @property
+    def name(self):
+        """显示名称（不创建Enemy对象）"""
+        return self.store.prototype(self.store.type_ids[self.index]).name
+
+    @property
+    def enemy(self):
+        return self.store.enemy(self.index)
+
+    def __eq__(self, other):
+        return isinstance(other, EnemyView) and other.store is self.store and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+
+class EnemyStore:
+    """
+    以并列的类型化数组（结构数组）保存一关的所有敌人
+
+    每个敌人只占几个字节：位置、类型编号、HP、存活标志和Boss标志，
+    计数和筛选在数组上批量完成（有NumPy时向量化），
+    同类型的怪物配置只读取一次（原型），完整的Enemy对象按需创建
+    """
+    def __init__(self, create_enemy):
+        self._create_enemy = create_enemy  # 类型名 -> Enemy，用于创建原型
+        self.xs = array('H')
+        self.ys = array('H')
+        self.type_ids = array('H')
+        self.hps = array('i')
+        self.active = bytearray()
+        self.boss = bytearray()
+        self.type_names = []
+        self._type_index = {}
+        self._prototypes = []
+        self._enemies = {}  # 下标 -> 已创建的 StoredEnemy
+
+    def __len__(self):
+        return len(self.active)
+
+    def _type_id(self, enemy_type):
+        type_id = self._type_index.get(enemy_type)
+        if type_id is None:
+            type_id = len(self.type_names)
+            self._type_index[enemy_type] = type_id
+            self.type_names.append(enemy_type)
+            self._prototypes.append(self._create_enemy(enemy_type))
+        return type_id
+
+    def prototype(self, type_id):
+        """某类型的原型Enemy（只读，不要修改）"""
+        return self._prototypes[type_id]
+
+    def add(self, x, y, enemy_type, is_boss=False):
+        """加入一个敌人，返回其视图"""
+        type_id = self._type_id(enemy_type)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.type_ids.append(type_id)
+        self.hps.append(self._prototypes[type_id].max_hp)
+        self.active.append(1)
+        self.boss.append(1 if is_boss else 0)
+        return EnemyView(self, len(self.active) - 1)
+
+    def move(self, index, x, y):
+        """更新第index个敌人的位置"""
+        self.xs[index] = x
+        self.ys[index] = y
+
+    def view(self, index):
+        return EnemyView(self, index)
+
+    def __iter__(self):
+        return (EnemyView(self, i) for i in range(len(self.active)))
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.active)
+        if not 0 <= index < len(self.active):
+            raise IndexError("敌人下标越界")
+        return EnemyView(self, index)
+
+    def enemy(self, index):
+        """第index个敌人的Enemy对象，首次访问时由原型创建"""
+        enemy = self._enemies.get(index)
+        if enemy is None:
+            enemy = StoredEnemy(self, index, self._prototypes[self.type_ids[index]])
+            self._enemies[index] = enemy
+        return enemy
+
+    def count_active(self):
+        """存活敌人数量"""
+        return self.active.count(1)
+
+    def count_active_bosses(self):
+        """存活的Boss数量"""
+        return int(np.count_nonzero(np.frombuffer(self.active, dtype=np.uint8)
+                                    & np.frombuffer(self.boss, dtype=np.uint8)))
+
+    def active_indices(self, boss=None):
+        """存活敌人的下标列表；boss 为 True/False 时只返回Boss/非Boss"""
+        mask = np.frombuffer(self.active, dtype=np.uint8) == 1
+        if boss is not None:
+            mask &= (np.frombuffer(self.boss, dtype=np.uint8) == 1) == boss
+        return np.flatnonzero(mask).tolist()
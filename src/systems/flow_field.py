@@ -0,0 +1,98 @@
+from array import array
+from collections import OrderedDict, deque
+
+WALL = 1
+UNREACHABLE = -1
+
+FLOW_FIELD_CACHE_SIZE = 8  # 每张地图最多保留的距离场数量
+
+def explored_mask(stride, explored):
+    """把按行展开的探索标记（每格一个字节，1为已探索）转换为与地图缓冲区对齐的布局（边界填充为0）"""
+    size = stride - 2
+    mask = bytearray(stride * stride)
+    for y in range(size):
+        row_start = (y + 1) * stride + 1
+        mask[row_start:row_start + size] = explored[y * size:(y + 1) * size]
+    return mask
+
+class FlowField:
+    """
+    以target为终点的BFS距离场
+
+    在地图的带边界填充缓冲区（GameMap.cells）上从终点做一次广度优先搜索，
+    之后任意格子到终点的距离和下一步方向都是常数时间查表。
+    指定explored时只经过已探索的格子，不会借道迷雾泄露未探索区域的最短路线
+    """
+    def __init__(self, cells, stride, target, explored=None):
+        self.stride = stride
+        self.target = target
+        # 未指定explored时视为全部已探索
+        visible = explored_mask(stride, explored) if explored is not None else b'\x01' * len(cells)
+        dist = array('i', [UNREACHABLE]) * len(cells)
+        start = (target[1] + 1) * stride + target[0] + 1
+        if cells[start] != WALL and visible[start]:
+            dist[start] = 0
+            queue = deque([start])
+            # 缓冲区四周是一圈墙壁，邻居下标不会越界
+            offsets = (1, -1, stride, -stride)
+            while queue:
+                index = queue.popleft()
+                next_dist = dist[index] + 1
+                for offset in offsets:
+                    neighbor = index + offset
+                    if dist[neighbor] == UNREACHABLE and cells[neighbor] != WALL and visible[neighbor]:
+                        dist[neighbor] = next_dist
+                        queue.append(neighbor)
+        self._dist = dist
+
+    def distance(self, x, y):
+        """(x, y) 到终点的步数，不可达时返回 UNREACHABLE"""
+        return self._dist[(y + 1) * self.stride + x + 1]
+
+    def next_step(self, x, y):
+        """从 (x, y) 向终点走一步到达的相邻格子；已在终点或不可达时返回None"""
+        index = (y + 1) * self.stride + x + 1
+        current = self._dist[index]
+        if current <= 0:
+            return None
+        for dx, dy in ((1, 0), (0, 1), (-1, 0), (0, -1)):
+            if self._dist[index + dy * self.stride + dx] == current - 1:
+                return x + dx, y + dy
+        return None
+
+class FlowFieldCache:
+    """
+    按终点缓存距离场（LRU）
+
+    地图墙壁在一关内不变，只经过已探索格子的距离场在探索范围扩大（GameMap.explored_version 变化）后重新计算；
+    切换地图时清空
+    """
+    def __init__(self, capacity=FLOW_FIELD_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._game_map = None
+        self._fields = OrderedDict()
+
+    def get(self, game_map, target):
+        """返回 game_map 上以target为终点的距离场，命中时移动到最近使用位置"""
+        if game_map is not self._game_map:
+            self._fields.clear()
+            self._game_map = game_map
+        target = tuple(target)
+        version = getattr(game_map, 'explored_version', None)
+        entry = self._fields.get(target)
+        if entry is not None and entry[1] == version:
+            self._fields.move_to_end(target)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        field = FlowField(game_map.cells, game_map.stride, target, getattr(game_map, 'explored', None))
+        self._fields[target] = (field, version)
+        self._fields.move_to_end(target)
+        while len(self._fields) > self.capacity:
+            self._fields.popitem(last=False)
+        return field
+
+    def __len__(self):
+        return len(self._fields)
@@ -0,0 +1,61 @@
+# 递归阴影投射（recursive shadowcasting）视野计算
+# 只访问以观察点为中心、半径为radius的范围，耗时与地图大小无关
+
+# 八个卦限的坐标变换 (xx, xy, yx, yy)
+OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+def compute_fov(is_wall, origin_x, origin_y, radius):
+    """
+    计算从 (origin_x, origin_y) 可见的格子
+
+    is_wall: is_wall(x, y) 判断格子是否阻挡视线（越界应返回True）
+    返回可见格子坐标的集合（包含可见的墙壁，可能包含越界坐标）
+    """
+    visible = {(origin_x, origin_y)}
+    for xx, xy, yx, yy in OCTANTS:
+        _cast_light(is_wall, origin_x, origin_y, 1, 1.0, 0.0, radius, xx, xy, yx, yy, visible)
+    return visible
+
+def _cast_light(is_wall, cx, cy, row, start, end, radius, xx, xy, yx, yy, visible):
+    """扫描一个卦限中斜率在 [end, start] 之间的部分，遇到墙壁时递归拆分"""
+    if start < end:
+        return
+    radius_sq = radius * radius
+    new_start = start
+    for distance in range(row, radius + 1):
+        dx = -distance - 1
+        dy = -distance
+        blocked = False
+        while dx <= 0:
+            dx += 1
+            # 卦限坐标转换为地图坐标
+            x = cx + dx * xx + dy * xy
+            y = cy + dx * yx + dy * yy
+            left_slope = (dx - 0.5) / (dy + 0.5)
+            right_slope = (dx + 0.5) / (dy - 0.5)
+            if start < right_slope:
+                continue
+            if end > left_slope:
+                break
+
+            if dx * dx + dy * dy <= radius_sq:
+                visible.add((x, y))
+
+            if blocked:
+                # 仍在墙壁后面
+                if is_wall(x, y):
+                    new_start = right_slope
+                    continue
+                blocked = False
+                start = new_start
+            elif is_wall(x, y) and distance < radius:
+                # 遇到墙壁：递归扫描墙壁之前的部分
+                blocked = True
+                _cast_light(is_wall, cx, cy, distance + 1, start, left_slope, radius,
+                            xx, xy, yx, yy, visible)
+                new_start = right_slope
+        if blocked:
+            break
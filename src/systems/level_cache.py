@@ -0,0 +1,194 @@
+import os
+import struct
+import threading
+import zlib
+import hashlib
+
+import numpy as np
+
+WALL = 1
+EMPTY = 0
+
+# 生成算法版本：迷宫、连通性修复或内容生成的结果发生变化时递增，旧缓存随之失效
+GENERATOR_VERSION = 2
+
+# 二进制关卡格式
+LEVEL_MAGIC = b"MZLV"
+LEVEL_FORMAT_VERSION = 1
+LEVEL_FILE_SUFFIX = ".lvl"
+LEVEL_CACHE_MAX_FILES = 64  # 缓存目录最多保留的关卡文件数，超出时删除最久未使用的
+# 文件头：魔数、格式版本、生成算法版本、边长、种子、关卡、出口x、出口y、敌人数、道具数
+_HEADER = struct.Struct("<4sHHHQIHHHH")
+# 实体记录：x、y、标志位、名称字节数（之后是UTF-8名称）
+_SPAWN = struct.Struct("<HHBB")
+_CRC = struct.Struct("<I")
+
+SPAWN_FLAG_BOSS = 0x01
+
+def derive_level_seed(run_seed, level):
+    """由整局种子和关卡编号派生该关的种子（与Python的hash随机化无关，跨进程稳定）"""
+    digest = hashlib.blake2b(f"{run_seed}:{level}".encode("ascii"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+class LevelRecord:
+    """
+    一个关卡生成结果的可序列化描述
+
+    cells 为按行展开的地图（每格一个字节，WALL/EMPTY），
+    enemies 元素为 (x, y, 敌人类型, 是否Boss)，items 元素为 (x, y, 道具名称)
+    """
+    def __init__(self, size, seed, level, cells, exit_point, enemies, items):
+        self.size = size
+        self.seed = seed
+        self.level = level
+        self.cells = cells
+        self.exit_point = exit_point
+        self.enemies = enemies
+        self.items = items
+
+def pack_walls(cells):
+    """每格一位打包地图（墙壁为1，行优先，每字节高位在前）"""
+    return np.packbits(np.frombuffer(cells, dtype=np.uint8) == WALL).tobytes()
+
+def unpack_walls(data, count):
+    """pack_walls 的逆操作，返回长度为count的bytearray（WALL/EMPTY）"""
+    return bytearray(np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count).tobytes())
+
+def _pack_spawn(x, y, flags, name):
+    encoded = name.encode("utf-8")
+    return _SPAWN.pack(x, y, flags, len(encoded)) + encoded
+
+def _unpack_spawn(data, offset):
+    x, y, flags, length = _SPAWN.unpack_from(data, offset)
+    offset += _SPAWN.size
+    name = bytes(data[offset:offset + length]).decode("utf-8")
+    return (x, y, flags, name), offset + length
+
+def encode_level(record):
+    """把LevelRecord编码为二进制（文件头 + 位图 + 实体记录 + CRC32校验）"""
+    parts = [
+        _HEADER.pack(LEVEL_MAGIC, LEVEL_FORMAT_VERSION, GENERATOR_VERSION, record.size,
+                     record.seed, record.level, record.exit_point[0], record.exit_point[1],
+                     len(record.enemies), len(record.items)),
+        pack_walls(record.cells),
+    ]
+    for x, y, enemy_type, is_boss in record.enemies:
+        parts.append(_pack_spawn(x, y, SPAWN_FLAG_BOSS if is_boss else 0, enemy_type))
+    for x, y, item_name in record.items:
+        parts.append(_pack_spawn(x, y, 0, item_name))
+    body = b"".join(parts)
+    return body + _CRC.pack(zlib.crc32(body))
+
+def decode_level(data):
+    """
+    解码 encode_level 生成的数据
+
+    格式或生成算法版本不匹配、数据损坏时抛出ValueError
+    """
+    if len(data) < _HEADER.size + _CRC.size:
+        raise ValueError("关卡数据过短")
+    body = memoryview(data)[:-_CRC.size]
+    (checksum,) = _CRC.unpack_from(data, len(data) - _CRC.size)
+    if zlib.crc32(body) != checksum:
+        raise ValueError("关卡数据校验失败")
+    (magic, format_version, generator_version, size, seed, level,
+     exit_x, exit_y, enemy_count, item_count) = _HEADER.unpack_from(body, 0)
+    if magic != LEVEL_MAGIC or format_version != LEVEL_FORMAT_VERSION:
+        raise ValueError("不支持的关卡格式")
+    if generator_version != GENERATOR_VERSION:
+        raise ValueError(f"关卡由旧版生成算法生成（{generator_version}）")
+
+    offset = _HEADER.size
+    wall_bytes = (size * size + 7) // 8
+    cells = unpack_walls(body[offset:offset + wall_bytes], size * size)
+    offset += wall_bytes
+
+    enemies = []
+    for _ in range(enemy_count):
+        (x, y, flags, enemy_type), offset = _unpack_spawn(body, offset)
+        enemies.append((x, y, enemy_type, bool(flags & SPAWN_FLAG_BOSS)))
+    items = []
+    for _ in range(item_count):
+        (x, y, _flags, item_name), offset = _unpack_spawn(body, offset)
+        items.append((x, y, item_name))
+    if offset != len(body):
+        raise ValueError("关卡数据长度不匹配")
+    return LevelRecord(size, seed, level, cells, (exit_x, exit_y), enemies, items)
+
+class LevelCache:
+    """
+    按 (生成算法版本, 种子, 关卡, 边长) 保存关卡的磁盘缓存
+
+    目录中的文件也可以是预先生成并验证过的关卡包；
+    写入先写临时文件再原子替换，可在预生成线程中安全调用。
+    文件数超过 max_files 时按修改时间删除最旧的文件（读取命中时会刷新修改时间）
+    """
+    def __init__(self, directory, max_files=LEVEL_CACHE_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+
+    def path_for(self, seed, level, size):
+        name = f"v{GENERATOR_VERSION}_{seed:016x}_{level}_{size}{LEVEL_FILE_SUFFIX}"
+        return os.path.join(self.directory, name)
+
+    def load(self, seed, level, size):
+        """读取缓存的关卡，不存在或无法使用时返回None"""
+        path = self.path_for(seed, level, size)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"读取关卡缓存出错: {e}")
+            return None
+        try:
+            record = decode_level(data)
+        except (ValueError, struct.error, UnicodeDecodeError) as e:
+            print(f"关卡缓存 {path} 无效: {e}")
+            return None
+        if (record.seed, record.level, record.size) != (seed, level, size):
+            print(f"关卡缓存 {path} 与请求的关卡不符")
+            return None
+        try:
+            os.utime(path)  # 标记为最近使用，清理时最后删除
+        except OSError:
+            pass
+        return record
+
+    def save(self, record):
+        """写入关卡缓存，失败时只打印错误（缓存不影响游戏）"""
+        path = self.path_for(record.seed, record.level, record.size)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(encode_level(record))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"写入关卡缓存出错: {e}")
+            return
+        self.prune()
+
+    def prune(self):
+        """关卡文件数超过 max_files 时删除最久未使用的文件，返回删除的文件数"""
+        if self.max_files is None:
+            return 0
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.is_file() and entry.name.endswith(LEVEL_FILE_SUFFIX)]
+        except OSError as e:
+            print(f"清理关卡缓存出错: {e}")
+            return 0
+        excess = len(entries) - self.max_files
+        if excess <= 0:
+            return 0
+        removed = 0
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:excess]:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass  # 可能已被其他进程删除
+        return removed
@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class LevelPrefetcher:
+    """
+    在后台线程中提前生成下一关的地图
+
+    build_level(level, *args, cancelled=事件) 在工作线程中调用，只创建并返回新对象，不访问当前关卡的任何状态；
+    args（例如该关的种子）在提交时确定，之后界面线程的状态变化不会影响已提交的任务。
+    任务被丢弃时 cancelled 事件被设置，已开始的生成据此跳过写缓存等副作用。
+    界面线程通过 take() 取得完整生成好的地图后一次性替换，切换关卡时无需等待生成
+    """
+    def __init__(self, build_level):
+        self._build_level = build_level
+        self._executor = None
+        self._level = None   # 正在准备的关卡编号
+        self._args = None    # 提交时的参数
+        self._future = None
+        self._cancelled = None
+
+    def prefetch(self, level, *args):
+        """开始在后台生成第level关（已在用相同参数准备同一关时不重复提交）"""
+        if self._future is not None and self._level == level and self._args == args:
+            return
+        self.discard()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="LevelPrefetch")
+        self._level = level
+        self._args = args
+        self._cancelled = threading.Event()
+        self._future = self._executor.submit(self._build_level, level, *args, cancelled=self._cancelled)
+
+    def take(self, level):
+        """
+        取出为第level关准备的地图
+
+        后台仍在生成时等待其完成；没有为该关预生成或生成失败时返回None（由调用方同步生成）
+        """
+        if self._future is None or self._level != level:
+            return None
+        future = self._future
+        self._future = None
+        self._level = None
+        self._args = None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"后台生成第 {level} 关出错: {e}")
+            return None
+
+    def discard(self):
+        """丢弃正在准备的关卡（已开始的生成会在后台完成，结果被丢弃）"""
+        if self._future is not None:
+            self._future.cancel()
+            self._cancelled.set()
+        self._future = None
+        self._level = None
+        self._args = None
+
+    def shutdown(self):
+        """退出时调用：丢弃未完成的任务并关闭工作线程"""
+        self.discard()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,229 @@
+import heapq
+import random
+from collections import deque
+
+WALL = 1
+
+# 调度间隔（毫秒）：追击中的怪物更新最频繁，远离玩家的怪物只偶尔检查一次是否需要醒来
+AI_CHASE_INTERVAL_MS = 800
+AI_PATROL_INTERVAL_MS = 1500
+AI_SLEEP_INTERVAL_MS = 2500
+AI_CHASE_RADIUS = 6  # 与玩家的切比雪夫距离不超过该值时开始追击
+AI_GIVE_UP_RADIUS = 10  # 追击中的怪物（路径可能绕远）超出该距离才放弃
+AI_WAKE_RADIUS = 14  # 超出该距离的怪物休眠（不移动）
+AI_MAX_UPDATES_PER_TICK = 64  # 每次tick最多更新的怪物数，未处理的顺延到下一次
+AI_PATH_MAX_NODES = 600  # 单次A*最多展开的节点数
+
+_NEIGHBORS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+def find_path(cells, stride, start, goal, max_nodes=AI_PATH_MAX_NODES):
+    """
+    在带边界填充的地图缓冲区上做A*（4邻接，曼哈顿距离启发）
+
+    返回从start之后的第一格到goal的格子列表；start == goal 时返回空列表，
+    找不到路径或展开节点超过max_nodes时返回None
+    """
+    if start == goal:
+        return []
+    goal_x, goal_y = goal
+    start_index = (start[1] + 1) * stride + start[0] + 1
+    goal_index = (goal_y + 1) * stride + goal_x + 1
+    if cells[goal_index] == WALL:
+        return None
+    offsets = (1, stride, -1, -stride)
+    came_from = {start_index: None}
+    cost = {start_index: 0}
+    open_heap = [(abs(start[0] - goal_x) + abs(start[1] - goal_y), 0, start_index)]
+    expanded = 0
+    while open_heap:
+        _, g, index = heapq.heappop(open_heap)
+        if index == goal_index:
+            break
+        if g > cost[index]:
+            continue
+        expanded += 1
+        if expanded > max_nodes:
+            return None
+        for offset in offsets:
+            neighbor = index + offset
+            if cells[neighbor] == WALL:
+                continue
+            new_cost = g + 1
+            if new_cost < cost.get(neighbor, new_cost + 1):
+                cost[neighbor] = new_cost
+                came_from[neighbor] = index
+                y, x = divmod(neighbor, stride)
+                heuristic = abs(x - 1 - goal_x) + abs(y - 1 - goal_y)
+                heapq.heappush(open_heap, (new_cost + heuristic, new_cost, neighbor))
+    else:
+        return None
+
+    path = []
+    index = goal_index
+    while index != start_index:
+        y, x = divmod(index, stride)
+        path.append((x - 1, y - 1))
+        index = came_from[index]
+    path.reverse()
+    return path
+
+class PathCache:
+    """
+    每个怪物缓存一条通往目标的A*路径
+
+    目标（玩家）移动到原目标的相邻格子时直接修补路径（目标已在路径上则截断，否则追加一格），
+    只有路径失效（怪物偏离路径或目标跳跃）时才重新搜索
+    """
+    def __init__(self, cells, stride):
+        self.cells = cells
+        self.stride = stride
+        self.searches = 0
+        self.repairs = 0
+        self.hits = 0
+        self._paths = {}  # 怪物下标 -> (剩余路径deque, 目标)
+
+    def next_step(self, key, start, goal):
+        """怪物key从start走向goal的下一格，没有路径时返回None"""
+        entry = self._paths.get(key)
+        if entry is not None:
+            path, path_goal = entry
+            if path and abs(path[0][0] - start[0]) + abs(path[0][1] - start[1]) == 1:
+                if path_goal == goal:
+                    self.hits += 1
+                    return path[0]
+                if abs(path_goal[0] - goal[0]) + abs(path_goal[1] - goal[1]) == 1:
+                    self._repair(path, goal)
+                    self._paths[key] = (path, goal)
+                    self.repairs += 1
+                    return path[0] if path else None
+
+        self.searches += 1
+        found = find_path(self.cells, self.stride, start, goal)
+        if not found:
+            self._paths.pop(key, None)
+            return None
+        path = deque(found)
+        self._paths[key] = (path, goal)
+        return path[0]
+
+    @staticmethod
+    def _repair(path, goal):
+        """目标移动了一格：目标已在路径上时截断到目标，否则把目标追加到末尾"""
+        for i, cell in enumerate(path):
+            if cell == goal:
+                for _ in range(len(path) - i - 1):
+                    path.pop()
+                return
+        path.append(goal)
+
+    def advance(self, key, cell):
+        """怪物key已走到cell，弹出路径的第一格"""
+        entry = self._paths.get(key)
+        if entry is not None and entry[0] and entry[0][0] == cell:
+            entry[0].popleft()
+
+    def forget(self, key):
+        self._paths.pop(key, None)
+
+class MonsterAI:
+    """
+    怪物巡逻与追击
+
+    用优先队列（heapq，按唤醒时间排序）调度：每次tick只弹出已到期的怪物，
+    并且最多处理 AI_MAX_UPDATES_PER_TICK 个。离玩家远的怪物以较长间隔休眠，
+    附近的巡逻，进入追击范围的沿缓存的A*路径走向玩家。Boss守在原地不移动
+    """
+    def __init__(self, game_map, seed=None):
+        self.game_map = game_map
+        self.rng = random.Random(seed)
+        self.paths = PathCache(game_map.cells, game_map.stride)
+        self.last_updates = 0
+        self._queue = []
+        self._counter = 0  # 相同唤醒时间时保持先进先出
+        self._known = 0  # 已加入调度的敌人数量
+        self._heading = {}  # 巡逻方向：怪物下标 -> (dx, dy)
+        self._chasing = set()  # 正在追击的怪物下标
+
+    def _schedule(self, index, wake_time):
+        self._counter += 1
+        heapq.heappush(self._queue, (wake_time, self._counter, index))
+
+    def _schedule_new(self, now):
+        """把新加入地图的敌人加入调度（唤醒时间随机错开，避免同时更新）"""
+        enemies = self.game_map.enemies
+        for index in range(self._known, len(enemies)):
+            if not enemies.boss[index]:
+                self._schedule(index, now + self.rng.randrange(AI_PATROL_INTERVAL_MS))
+        self._known = len(enemies)
+
+    def update(self, now, player_cell):
+        """
+        处理到期的怪物，now 为毫秒时间
+
+        返回发生变化的格子列表（移动前后的位置），调用方负责 mark_changed
+        """
+        self._schedule_new(now)
+        enemies = self.game_map.enemies
+        changed = []
+        updates = 0
+        while self._queue and self._queue[0][0] <= now and updates < AI_MAX_UPDATES_PER_TICK:
+            _, _, index = heapq.heappop(self._queue)
+            if not enemies.active[index]:
+                self.paths.forget(index)
+                self._heading.pop(index, None)
+                self._chasing.discard(index)
+                continue
+            updates += 1
+            x, y = enemies.xs[index], enemies.ys[index]
+            distance = max(abs(x - player_cell[0]), abs(y - player_cell[1]))
+            if distance > AI_WAKE_RADIUS:
+                self.paths.forget(index)
+                self._chasing.discard(index)
+                self._schedule(index, now + AI_SLEEP_INTERVAL_MS)
+                continue
+            target = None
+            if distance <= AI_CHASE_RADIUS or (index in self._chasing and distance <= AI_GIVE_UP_RADIUS):
+                target = self.paths.next_step(index, (x, y), player_cell)
+            if target is not None:
+                self._chasing.add(index)
+            else:
+                self._chasing.discard(index)
+            if index in self._chasing:
+                interval = AI_CHASE_INTERVAL_MS
+            else:
+                target = self._patrol_step(index, x, y)
+                interval = AI_PATROL_INTERVAL_MS
+            if target is not None and self._can_enter(target):
+                self.game_map.move_enemy(enemies.view(index), target[0], target[1])
+                self.paths.advance(index, target)
+                changed.append((x, y))
+                changed.append(target)
+            self._schedule(index, now + interval)
+        self.last_updates = updates
+        return changed
+
+    def _can_enter(self, cell):
+        """怪物不会走到墙壁、出口或其他敌人所在的格子"""
+        x, y = cell
+        return (not self.game_map.is_wall(x, y) and cell != tuple(self.game_map.exit_point)
+                and self.game_map.get_enemy_at(x, y) is None)
+
+    def _patrol_step(self, index, x, y):
+        """沿当前方向巡逻，遇到路口或死路时随机换方向（尽量不掉头）"""
+        heading = self._heading.get(index)
+        options = [(dx, dy) for dx, dy in _NEIGHBORS if not self.game_map.is_wall(x + dx, y + dy)]
+        if not options:
+            return None
+        forward = [d for d in options if heading is None or d != (-heading[0], -heading[1])]
+        if heading in options and len(options) <= 2:
+            choice = heading
+        else:
+            choice = self.rng.choice(forward or options)
+        self._heading[index] = choice
+        return x + choice[0], y + choice[1]
+
+    def stats_text(self):
+        """开发者面板显示的统计信息"""
+        paths = self.paths
+        return (f"怪物AI: 本次更新 {self.last_updates} 个，调度中 {len(self._queue)}，"
+                f"寻路 {paths.searches} / 修补 {paths.repairs} / 命中 {paths.hits}")
@@ -0,0 +1,139 @@
+import json
+import math
+import os
+import time
+import functools
+from collections import deque
+
+class _StageTimer:
+    """统计一个阶段耗时的上下文管理器"""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.name, (time.perf_counter_ns() - self.start) / 1e6)
+        return False
+
+class _NullTimer:
+    """性能统计关闭时使用的空上下文管理器"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def percentile(sorted_values, ratio):
+    """最近秩法求百分位数（输入需已排序）"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(ratio * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+class FrameProfiler:
+    """按阶段统计每帧耗时，保留最近window个样本计算p50/p95/p99"""
+    def __init__(self, window=300, enabled=True):
+        self.enabled = enabled
+        self.window = window
+        self._timings = {}  # 阶段名 -> 最近的耗时（毫秒）
+        self._totals = {}  # 阶段名 -> 总调用次数
+        self._counters = {}  # 计数器名 -> 最近的数值
+
+    def stage(self, name):
+        """返回统计某个阶段耗时的上下文管理器"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def record(self, name, ms):
+        """记录一次阶段耗时（毫秒）"""
+        samples = self._timings.get(name)
+        if samples is None:
+            samples = self._timings[name] = deque(maxlen=self.window)
+            self._totals[name] = 0
+        samples.append(ms)
+        self._totals[name] += 1
+
+    def count(self, name, value):
+        """记录一个每帧计数（如场景图元数量）"""
+        if not self.enabled:
+            return
+        values = self._counters.get(name)
+        if values is None:
+            values = self._counters[name] = deque(maxlen=self.window)
+        values.append(value)
+
+    def has_samples(self):
+        return bool(self._timings) or bool(self._counters)
+
+    def report(self):
+        """生成所有阶段和计数器的统计数据"""
+        stages = {}
+        for name, samples in self._timings.items():
+            ordered = sorted(samples)
+            stages[name] = {
+                "calls": self._totals[name],
+                "p50_ms": percentile(ordered, 0.50),
+                "p95_ms": percentile(ordered, 0.95),
+                "p99_ms": percentile(ordered, 0.99),
+                "max_ms": ordered[-1],
+            }
+        counters = {}
+        for name, values in self._counters.items():
+            ordered = sorted(values)
+            counters[name] = {
+                "last": values[-1],
+                "p50": percentile(ordered, 0.50),
+                "max": ordered[-1],
+            }
+        return {"window": self.window, "stages": stages, "counters": counters}
+
+    def summary_lines(self):
+        """开发者面板叠加层显示的文字"""
+        report = self.report()
+        lines = []
+        for name, stats in report["stages"].items():
+            lines.append(f"{name}: p50 {stats['p50_ms']:.2f} / p95 {stats['p95_ms']:.2f} / "
+                         f"p99 {stats['p99_ms']:.2f} ms ({stats['calls']}次)")
+        for name, stats in report["counters"].items():
+            lines.append(f"{name}: {stats['last']} (p50 {stats['p50']}, 最大 {stats['max']})")
+        return lines or ["暂无性能数据"]
+
+    def export_json(self, path):
+        """把统计数据导出为JSON文件，便于离线对比"""
+        data = self.report()
+        data["exported_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            return True
+        except Exception as e:
+            print(f"导出性能数据失败: {e}")
+            return False
+
+def profiled(stage_name):
+    """方法装饰器：用实例的profiler属性统计方法耗时（未设置时不做任何事）"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(self, 'profiler', None)
+            if profiler is None or not profiler.enabled:
+                return func(self, *args, **kwargs)
+            with profiler.stage(stage_name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,157 @@
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from .raycaster import cast_ray_dda, ray_angle, wall_brightness, WALL_SIDES, MAX_DIST
+
+# 预计算模式
+RAY_TABLE_LAZY = "lazy"  # 首次到达某个视角时计算
+RAY_TABLE_EAGER = "eager"  # 地图生成后由后台线程计算所有视角
+
+POSITION_STEPS = 10  # 每格的量化位置数（与移动步长0.1一致）
+DIRECTIONS = (0, 90, 180, 270)
+
+# 紧凑存储：距离用uint16定点数，墙面类型和纹理坐标合并为一个字节
+DIST_SCALE = 6000
+NO_HIT = 0xFFFF
+SIDE_BIT = 0x80
+TEXTURE_STEPS = 0x80
+
+class RayHitTable:
+    """
+    按量化位置和朝向缓存每个屏幕列的墙壁命中结果
+
+    地图在生成后是静态的，同一位置同一朝向的射线结果在本关内不会改变，
+    稳定状态下渲染只需查表，不需要再投射射线。
+    每种列数（渲染质量等级的射线数量）各有一组结果，质量控制器改变列数后仍可查表；
+    后台预计算只计算 num_rays 列。
+    lookup 可以在后台线程中调用（地图的墙壁在本关内不变），未计算过的视角在该线程中计算
+    """
+    def __init__(self, game_map, num_rays=120):
+        self.game_map = game_map
+        self.num_rays = num_rays
+        self._rows = {}  # 列数 -> {视角键: 压缩结果}
+        self._worker = None
+        self._stop = threading.Event()
+        self._ray_dirs = {}  # (列数, 朝向) -> 每列射线的 (sin, cos)，首次使用时计算
+
+    def supports(self, direction, num_rays):
+        """该朝向和列数是否可以查表"""
+        return num_rays > 0 and direction in DIRECTIONS
+
+    def has(self, px, py, direction, num_rays=None):
+        """该视角的所有列是否已经计算过（查表不需要再投射射线）"""
+        if direction not in DIRECTIONS:
+            return False
+        rows = self._rows.get(num_rays or self.num_rays)
+        key = self._key(round(px * POSITION_STEPS), round(py * POSITION_STEPS), direction)
+        return rows is not None and key in rows
+
+    def _key(self, qx, qy, direction):
+        stride = self.game_map.size * POSITION_STEPS + 1
+        return (qy * stride + qx) * len(DIRECTIONS) + DIRECTIONS.index(direction)
+
+    def _ray_directions(self, direction, num_rays):
+        """某个朝向下每列射线的 (sin, cos)"""
+        dirs = self._ray_dirs.get((num_rays, direction))
+        if dirs is None:
+            angles = [ray_angle(direction, i, num_rays) for i in range(num_rays)]
+            dirs = [(math.sin(a), math.cos(a)) for a in angles]
+            self._ray_dirs[(num_rays, direction)] = dirs
+        return dirs
+
+    def lookup(self, px, py, direction, num_rays=None):
+        """
+        查询某个视角的所有列（num_rays 默认为预计算的列数），未计算过时立即计算
+
+        返回格式与 FirstPersonView.compute_columns 相同
+        """
+        num_rays = num_rays or self.num_rays
+        qx = round(px * POSITION_STEPS)
+        qy = round(py * POSITION_STEPS)
+        key = self._key(qx, qy, direction)
+        rows = self._rows.setdefault(num_rays, {})
+        row = rows.get(key)
+        if row is None:
+            row = self._fill(qx, qy, direction, num_rays)
+            rows[key] = row
+
+        dists, sides = row
+        columns = []
+        for packed_dist, packed_side in zip(dists, sides):
+            if packed_dist == NO_HIT:
+                columns.append(None)
+                continue
+            dist = packed_dist / DIST_SCALE
+            wall_type = WALL_SIDES[1 if packed_side & SIDE_BIT else 0]
+            texture_offset = (packed_side & (TEXTURE_STEPS - 1)) / TEXTURE_STEPS
+            columns.append((dist, wall_type, texture_offset, wall_brightness(dist)))
+        return columns
+
+    def _fill(self, qx, qy, direction, num_rays):
+        """对一个量化视角投射所有射线并压缩存储"""
+        px = qx / POSITION_STEPS
+        py = qy / POSITION_STEPS
+        dists = array('H')
+        sides = array('B')
+        for sin_a, cos_a in self._ray_directions(direction, num_rays):
+            wall_hit = cast_ray_dda(self.game_map, px, py, sin_a, cos_a, MAX_DIST)
+            if wall_hit is None:
+                dists.append(NO_HIT)
+                sides.append(0)
+                continue
+            x, y, dist, wall_type, texture_offset = wall_hit
+            dists.append(min(NO_HIT - 1, int(round(dist * DIST_SCALE))))
+            side_bit = SIDE_BIT if wall_type == WALL_SIDES[1] else 0
+            sides.append(side_bit | min(TEXTURE_STEPS - 1, int(texture_offset * TEXTURE_STEPS)))
+        return dists, sides
+
+    def start_background_fill(self):
+        """启动后台线程，从入口开始按距离由近到远预计算所有视角"""
+        if self._worker is not None:
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._fill_all, name="RayHitTableFill", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """停止后台计算"""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=1.0)
+            self._worker = None
+
+    def _fill_all(self):
+        """后台线程：广度优先遍历可通行格子，计算格子内所有量化位置"""
+        game_map = self.game_map
+        start = (int(game_map.player_x), int(game_map.player_y))
+        rows = self._rows.setdefault(self.num_rays, {})
+        visited = {start}
+        queue = deque([start])
+        while queue and not self._stop.is_set():
+            cx, cy = queue.popleft()
+            for sub_y in range(POSITION_STEPS):
+                for sub_x in range(POSITION_STEPS):
+                    qx = cx * POSITION_STEPS + sub_x
+                    qy = cy * POSITION_STEPS + sub_y
+                    for direction in DIRECTIONS:
+                        key = self._key(qx, qy, direction)
+                        if key not in rows:
+                            rows[key] = self._fill(qx, qy, direction, self.num_rays)
+                if self._stop.is_set():
+                    return
+                # 让出GIL，避免阻塞界面线程
+                time.sleep(0)
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                nx, ny = cx + dx, cy + dy
+                if (nx, ny) not in visited and not game_map.is_wall(nx, ny):
+                    visited.add((nx, ny))
+                    queue.append((nx, ny))
+
+    def __len__(self):
+        return sum(len(rows) for rows in self._rows.values())
+
+    def memory_bytes(self):
+        """已计算视角占用的数据大小（不含容器开销）"""
+        return sum(len(rows) * num_rays * 3 for num_rays, rows in self._rows.items())
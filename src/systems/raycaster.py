@@ -0,0 +1,258 @@
+import math
+
+import numpy as np
+
+# 射线投射参数
+FOV_DEGREES = 30  # 视野范围（度）
+MAX_DIST = 10  # 最大可视距离
+MARCH_STEP = 0.1  # 步进法的步长
+
+# 射线投射模式
+RAY_CASTER_MARCH = "march"  # 固定步长步进（旧算法）
+RAY_CASTER_DDA = "dda"  # 网格边界精确遍历
+RAY_CASTER_NUMPY = "numpy"  # NumPy批量DDA，一次计算所有列
+
+WALL_SIDES = ("vertical", "horizontal")
+WALL = 1
+
+# 墙壁基础颜色
+WALL_BASE_COLORS = {
+    "vertical": (100, 100, 100),
+    "horizontal": (120, 120, 120),
+}
+
+def ray_angle(player_dir, index, num_rays):
+    """计算第index条射线的角度（弧度）"""
+    return math.radians(player_dir + FOV_DEGREES * (index / num_rays - 0.5))
+
+def wall_brightness(dist):
+    """根据距离计算墙壁亮度系数"""
+    return max(0.3, 1 - dist / MAX_DIST)
+
+def cast_ray_march(game_map, px, py, sin_a, cos_a, max_dist=MAX_DIST):
+    """
+    固定步长步进法投射射线
+
+    返回 (x, y, dist, wall_type, texture_offset)，未击中墙壁返回None
+    """
+    step = MARCH_STEP
+    dist = step
+
+    while dist <= max_dist:
+        # 计算射线上的点
+        x = px + dist * cos_a
+        y = py + dist * sin_a
+
+        # 检查是否击中墙壁
+        if game_map.is_wall(int(x), int(y)):
+            wall_type = "vertical" if abs(cos_a) > abs(sin_a) else "horizontal"
+            texture_offset = x if wall_type == "vertical" else y
+            return (x, y, dist, wall_type, texture_offset)
+
+        dist += step
+
+    return None
+
+def cast_ray_dda(game_map, px, py, sin_a, cos_a, max_dist=MAX_DIST):
+    """
+    DDA网格遍历法投射射线，只访问射线实际穿过的格子
+
+    返回 (x, y, dist, wall_type, texture_offset)，未击中墙壁返回None
+    wall_type: "vertical" 表示击中x方向的格子边界，"horizontal" 表示击中y方向的格子边界
+    texture_offset: 击中点在墙面上的位置（0~1）
+    """
+    map_x = int(px)
+    map_y = int(py)
+
+    # 射线穿过一个格子在x/y方向上所走的距离
+    delta_x = abs(1 / cos_a) if cos_a != 0 else math.inf
+    delta_y = abs(1 / sin_a) if sin_a != 0 else math.inf
+
+    # 到达下一条x/y格子边界的距离
+    if cos_a < 0:
+        step_x = -1
+        side_dist_x = (px - map_x) * delta_x
+    else:
+        step_x = 1
+        side_dist_x = (map_x + 1 - px) * delta_x
+    if sin_a < 0:
+        step_y = -1
+        side_dist_y = (py - map_y) * delta_y
+    else:
+        step_y = 1
+        side_dist_y = (map_y + 1 - py) * delta_y
+
+    is_wall = game_map.is_wall
+    while True:
+        # 跨过最近的格子边界
+        if side_dist_x < side_dist_y:
+            dist = side_dist_x
+            side_dist_x += delta_x
+            map_x += step_x
+            wall_type = "vertical"
+        else:
+            dist = side_dist_y
+            side_dist_y += delta_y
+            map_y += step_y
+            wall_type = "horizontal"
+
+        if dist > max_dist:
+            return None
+
+        if is_wall(map_x, map_y):
+            x = px + dist * cos_a
+            y = py + dist * sin_a
+            if wall_type == "vertical":
+                texture_offset = y - math.floor(y)
+            else:
+                texture_offset = x - math.floor(x)
+            return (x, y, dist, wall_type, texture_offset)
+
+RAY_CASTERS = {
+    RAY_CASTER_MARCH: cast_ray_march,
+    RAY_CASTER_DDA: cast_ray_dda,
+}
+
+def grid_to_array(grid):
+    """把GameMap.grid转换为带一圈墙壁填充的uint8数组（供批量投射使用）"""
+    rows = np.frombuffer(b"".join(bytes(row) for row in grid), dtype=np.uint8).reshape(len(grid), -1)
+    return np.pad(rows, 1, constant_values=1)
+
+def cast_rays_batch(grid_array, px, py, player_dir, num_rays, max_dist=MAX_DIST):
+    """
+    用NumPy同时对所有屏幕列执行DDA投射
+
+    grid_array: grid_to_array() 返回的填充网格
+    返回 (dist, side, texture_offset, brightness, hit) 五个长度为num_rays的数组，
+    side为WALL_SIDES的下标，hit为False的列没有击中墙壁
+    """
+    angles = np.radians(player_dir + FOV_DEGREES * (np.arange(num_rays) / num_rays - 0.5))
+    sin_a = np.sin(angles)
+    cos_a = np.cos(angles)
+
+    map_x = np.full(num_rays, int(px), dtype=np.int64)
+    map_y = np.full(num_rays, int(py), dtype=np.int64)
+
+    step_x = np.where(cos_a < 0, -1, 1)
+    step_y = np.where(sin_a < 0, -1, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta_x = np.abs(1 / cos_a)
+        delta_y = np.abs(1 / sin_a)
+        side_dist_x = np.where(cos_a < 0, (px - map_x) * delta_x, (map_x + 1 - px) * delta_x)
+        side_dist_y = np.where(sin_a < 0, (py - map_y) * delta_y, (map_y + 1 - py) * delta_y)
+
+    dist = np.zeros(num_rays)
+    side = np.zeros(num_rays, dtype=np.int64)
+    hit = np.zeros(num_rays, dtype=bool)
+
+    limit = grid_array.shape[0] - 1
+    active = np.arange(num_rays)
+    while active.size:
+        # 所有未结束的射线同时跨过各自最近的格子边界
+        sx = side_dist_x[active]
+        sy = side_dist_y[active]
+        take_x = sx < sy
+        step_dist = np.where(take_x, sx, sy)
+        side_dist_x[active] = np.where(take_x, sx + delta_x[active], sx)
+        side_dist_y[active] = np.where(take_x, sy, sy + delta_y[active])
+        map_x[active] += np.where(take_x, step_x[active], 0)
+        map_y[active] += np.where(take_x, 0, step_y[active])
+
+        in_range = step_dist <= max_dist
+        cells = grid_array[np.clip(map_y[active] + 1, 0, limit), np.clip(map_x[active] + 1, 0, limit)]
+        newly_hit = in_range & (cells != 0)
+
+        hit_rays = active[newly_hit]
+        dist[hit_rays] = step_dist[newly_hit]
+        side[hit_rays] = np.where(take_x[newly_hit], 0, 1)
+        hit[hit_rays] = True
+
+        # 击中墙壁或超出最大距离的射线结束
+        active = active[in_range & ~newly_hit]
+
+    hit_x = px + dist * cos_a
+    hit_y = py + dist * sin_a
+    texture_offset = np.where(side == 0, hit_y - np.floor(hit_y), hit_x - np.floor(hit_x))
+    brightness = np.maximum(0.3, 1 - dist / MAX_DIST)
+    return dist, side, texture_offset, brightness, hit
+
+class GridSnapshot:
+    """GameMap.grid 的只读快照，可以安全地在后台线程中投射射线"""
+    __slots__ = ("size", "cells", "_array")
+
+    def __init__(self, grid):
+        self.size = len(grid)
+        self.cells = b"".join(bytes(row) for row in grid)
+        self._array = None
+
+    def is_wall(self, x, y):
+        if 0 <= x < self.size and 0 <= y < self.size:
+            return self.cells[y * self.size + x] == WALL
+        return True
+
+    def as_array(self):
+        """带一圈墙壁填充的uint8数组（首次调用时生成）"""
+        if self._array is None:
+            grid = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.size, self.size)
+            self._array = np.pad(grid, 1, constant_values=1)
+        return self._array
+
+def cast_columns(grid_source, px, py, player_dir, num_rays, ray_caster=RAY_CASTER_DDA, grid_array=None):
+    """
+    计算每个屏幕列的墙壁命中信息
+
+    grid_source: 任何提供 is_wall(x, y) 的对象（GameMap 或 GridSnapshot）
+    grid_array: 批量投射使用的填充网格，为None时不使用NumPy
+    返回长度为num_rays的列表，元素为 (dist, wall_type, texture_offset, brightness)，
+    未击中墙壁的列为None
+    """
+    if ray_caster == RAY_CASTER_NUMPY and grid_array is not None:
+        dist, side, texture_offset, brightness, hit = cast_rays_batch(
+            grid_array, px, py, player_dir, num_rays)
+        columns = []
+        for column in zip(hit.tolist(), dist.tolist(), side.tolist(), texture_offset.tolist(), brightness.tolist()):
+            if column[0]:
+                columns.append((column[1], WALL_SIDES[column[2]], column[3], column[4]))
+            else:
+                columns.append(None)
+        return columns
+
+    caster = RAY_CASTERS.get(ray_caster, cast_ray_dda)
+    columns = []
+    for i in range(num_rays):
+        angle = ray_angle(player_dir, i, num_rays)
+        wall_hit = caster(grid_source, px, py, math.sin(angle), math.cos(angle))
+        if wall_hit:
+            x, y, dist, wall_type, texture_offset = wall_hit
+            columns.append((dist, wall_type, texture_offset, wall_brightness(dist)))
+        else:
+            columns.append(None)
+    return columns
+
+def column_depths(columns):
+    """每个屏幕列到墙壁的距离（深度缓冲），未击中墙壁的列为无穷远"""
+    return [column[0] if column else math.inf for column in columns]
+
+def project_columns(columns, num_rays, view_width=800, view_height=600):
+    """
+    把列命中信息投影为屏幕上的墙壁切片
+
+    返回列表，元素为 (wall_x, wall_top, wall_width, wall_height, wall_type, texture_offset, brightness, rgb)
+    """
+    horizon = view_height / 2
+    wall_width = view_width / num_rays
+    slices = []
+    for i, column in enumerate(columns):
+        if not column:
+            continue
+        dist, wall_type, texture_offset, brightness = column
+
+        # 透视投影计算
+        wall_height = min(view_width, 400 / max(0.1, dist))
+        wall_top = horizon - wall_height / 2
+
+        # 根据距离和类型调整颜色
+        base = WALL_BASE_COLORS.get(wall_type, WALL_BASE_COLORS["vertical"])
+        rgb = (int(base[0] * brightness), int(base[1] * brightness), int(base[2] * brightness))
+        slices.append((i * wall_width, wall_top, wall_width, wall_height, wall_type, texture_offset, brightness, rgb))
+    return slices
@@ -0,0 +1,54 @@
+WALL = 1
+EMPTY = 0
+
+class SpawnPlanner:
+    """
+    地图生成时的出生点规划
+
+    创建时一次性建立可用空地的索引（排除指定格子以及 keep_away 周围 min_distance 以内的格子），
+    之后每次 take() 从索引中无放回地随机抽取一格：耗时与墙壁密度无关，同一格不会被分配两次，
+    空地用完时返回None，保证放置过程必定结束
+    """
+    def __init__(self, grid, rng, exclude=(), keep_away=None, min_distance=0):
+        self.rng = rng
+        excluded = set(exclude)
+        min_dist_sq = min_distance * min_distance
+        free = []
+        for y, row in enumerate(grid):
+            for x, value in enumerate(row):
+                if value != EMPTY or (x, y) in excluded:
+                    continue
+                if keep_away is not None and (x - keep_away[0]) ** 2 + (y - keep_away[1]) ** 2 < min_dist_sq:
+                    continue
+                free.append((x, y))
+        self._free = free
+        self._slots = {cell: i for i, cell in enumerate(free)}
+
+    def __len__(self):
+        return len(self._free)
+
+    def take(self):
+        """随机取出一个空地格子，没有剩余时返回None"""
+        if not self._free:
+            return None
+        index = self.rng.randrange(len(self._free))
+        cell = self._free[index]
+        self._remove_at(index)
+        return cell
+
+    def reserve(self, cell):
+        """把指定格子标记为已占用（例如Boss的位置），返回该格子之前是否可用"""
+        index = self._slots.get(cell)
+        if index is None:
+            return False
+        self._remove_at(index)
+        return True
+
+    def _remove_at(self, index):
+        """与末尾元素交换后弹出，O(1)"""
+        cell = self._free[index]
+        last = self._free.pop()
+        del self._slots[cell]
+        if last != cell:
+            self._free[index] = last
+            self._slots[last] = index
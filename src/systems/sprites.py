@@ -0,0 +1,68 @@
+import math
+from .raycaster import FOV_DEGREES, MAX_DIST
+
+# 精灵类型
+SPRITE_ENEMY = "enemy"
+SPRITE_BOSS = "boss"
+SPRITE_ITEM = "item"
+
+MIN_SPRITE_DIST = 0.3  # 比这更近的精灵（玩家所在格子）不绘制
+
+def sprite_view(px, py, facing, half_fov, x, y, max_dist=MAX_DIST, half_width=0.5):
+    """
+    格子 (x, y) 中心的精灵相对视角的 (距离, 角度偏移)，不在视锥内时返回None
+
+    facing、half_fov 为弧度；精灵有宽度（half_width格），中心略出视野时仍可能部分可见
+    """
+    dx = x + 0.5 - px
+    dy = y + 0.5 - py
+    dist = math.hypot(dx, dy)
+    if dist < MIN_SPRITE_DIST or dist > max_dist:
+        return None
+    offset = (math.atan2(dy, dx) - facing + math.pi) % (2 * math.pi) - math.pi
+    if abs(offset) > half_fov + math.atan2(half_width, dist):
+        return None
+    return dist, offset
+
+class SpriteIndex:
+    """
+    第一人称视图的视锥查询
+
+    直接查询地图的格子索引（GameMap 在敌人出现、移动、被击败和道具被拾取时增量维护），
+    不保存自己的副本，也不需要在地图变化时重建；
+    每帧只检查视锥包围盒内的格子，耗时与可见精灵数量相关，而与地图上的实体总数无关
+    """
+    def __init__(self, game_map):
+        self.game_map = game_map
+
+    def query_frustum(self, px, py, player_dir, fov_degrees=FOV_DEGREES, max_dist=MAX_DIST):
+        """
+        查询视锥内的精灵
+
+        返回列表，元素为 (dist, angle_offset, kind)，按距离由远到近排序（便于画家算法绘制）；
+        angle_offset 为精灵中心相对视线方向的角度（弧度，向射线角度增大的方向为正）
+        """
+        facing = math.radians(player_dir)
+        half_fov = math.radians(fov_degrees) / 2
+
+        # 视锥（扇形）的包围盒
+        xs = [px]
+        ys = [py]
+        for angle in (facing - half_fov, facing, facing + half_fov):
+            xs.append(px + math.cos(angle) * max_dist)
+            ys.append(py + math.sin(angle) * max_dist)
+        min_x, max_x = int(min(xs)) - 1, int(max(xs)) + 1
+        min_y, max_y = int(min(ys)) - 1, int(max(ys)) + 1
+
+        entities = [(enemy.x, enemy.y, SPRITE_BOSS if enemy.is_boss else SPRITE_ENEMY)
+                    for enemy in self.game_map.enemies_in(min_x, min_y, max_x, max_y)]
+        entities.extend((item.x, item.y, SPRITE_ITEM) for item in self.game_map.items_in(min_x, min_y, max_x, max_y))
+
+        visible = []
+        for x, y, kind in entities:
+            view = sprite_view(px, py, facing, half_fov, x, y, max_dist)
+            if view is not None:
+                visible.append((view[0], view[1], kind))
+
+        visible.sort(key=lambda sprite: sprite[0], reverse=True)
+        return visible
@@ -3,10 +3,13 @@ import os
 from pathlib import Path
 import sys
 import random
+from collections import deque
 
 WALL = 1
 EMPTY = 0
 
+APP_DATA_DIR_NAME = "RPG_Game"  # 用户数据目录下本游戏的文件夹名
+
 def load_config(filename):
     """
     加载配置文件
@@ -98,112 +101,173 @@ def get_config_path(filename):
     print(f"警告：无法找到配置文件 {filename}")
     return None
 
-def generate_perfect_maze(size):
+def get_user_data_dir(*parts):
     """
-    生成基于房间的迷宫（100%连通，有房间感）
-    使用递归分割算法
+    获取用户数据目录下的路径（游戏运行时写入的文件放在这里，而不是当前工作目录）
+
+    Windows 为 %LOCALAPPDATA%/RPG_Game，其他系统为 $XDG_DATA_HOME/RPG_Game
+    （未设置时为 ~/.local/share/RPG_Game）；目录由写入方按需创建
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return str(Path(base, APP_DATA_DIR_NAME, *parts))
+
+def generate_maze_cells(size, rng=random):
+    """
+    生成基于房间的迷宫，结果写入按行展开的 bytearray（下标 y * size + x）
+
+    递归分割算法的迭代版本：用显式栈代替递归，不受递归深度限制；
+    子区域的处理顺序与递归版本相同，同一随机种子生成的迷宫完全一致
+
+    返回 (size, cells)，size 为调整为奇数后的边长
     """
     # 确保大小为奇数
     if size % 2 == 0:
         size += 1
     
-    # 创建全墙网格
-    grid = [[WALL for _ in range(size)] for _ in range(size)]
-    
-    # 确保边界是墙壁
-    for i in range(size):
-        grid[0][i] = WALL
-        grid[size-1][i] = WALL
-        grid[i][0] = WALL
-        grid[i][size-1] = WALL
+    # 创建全墙网格（边界自然是墙壁）
+    cells = bytearray([WALL]) * (size * size)
     
-    # 递归分割
-    def divide(x, y, width, height):
+    stack = [(0, 0, size, size)]
+    while stack:
+        x, y, width, height = stack.pop()
         if width < 5 or height < 5:
             # 创建房间
-            for i in range(x+1, x+width-1):
-                for j in range(y+1, y+height-1):
-                    grid[j][i] = EMPTY
-            return
+            if width > 2 and height > 2:
+                empty_row = bytes(width - 2)
+                for j in range(y + 1, y + height - 1):
+                    row_start = j * size + x + 1
+                    cells[row_start:row_start + width - 2] = empty_row
+            continue
         
         # 选择分割线
-        divide_x = x + random.randint(2, width-3)
-        divide_y = y + random.randint(2, height-3)
+        divide_x = x + rng.randint(2, width - 3)
+        divide_y = y + rng.randint(2, height - 3)
         
         # 水平分割
-        if random.random() < 0.5:
+        if rng.random() < 0.5:
             # 创建水平墙
-            for i in range(x+1, x+width-1):
-                grid[divide_y][i] = WALL
+            row_start = divide_y * size + x + 1
+            cells[row_start:row_start + width - 2] = bytearray([WALL]) * (width - 2)
             
             # 创建通道
-            passage_x = x + random.randint(1, width-2)
-            grid[divide_y][passage_x] = EMPTY
+            passage_x = x + rng.randint(1, width - 2)
+            cells[divide_y * size + passage_x] = EMPTY
             
-            # 递归
-            divide(x, y, width, divide_y-y+1)
-            divide(x, divide_y, width, height-(divide_y-y))
+            # 后进先出：先压入第二个子区域，处理顺序与递归版本一致
+            stack.append((x, divide_y, width, height - (divide_y - y)))
+            stack.append((x, y, width, divide_y - y + 1))
         else:
-            # 创建垂直墙
-            for j in range(y+1, y+height-1):
-                grid[j][divide_x] = WALL
+            # 创建垂直墙（步长为一行的切片）
+            column_start = (y + 1) * size + divide_x
+            cells[column_start:column_start + (height - 2) * size:size] = bytearray([WALL]) * (height - 2)
             
             # 创建通道
-            passage_y = y + random.randint(1, height-2)
-            grid[passage_y][divide_x] = EMPTY
+            passage_y = y + rng.randint(1, height - 2)
+            cells[passage_y * size + divide_x] = EMPTY
             
-            # 递归
-            divide(x, y, divide_x-x+1, height)
-            divide(divide_x, y, width-(divide_x-x), height)
-    
-    # 初始分割
-    divide(0, 0, size, size)
+            stack.append((divide_x, y, width - (divide_x - x), height))
+            stack.append((x, y, divide_x - x + 1, height))
     
     # 确保入口和出口
-    grid[1][1] = EMPTY  # 入口
-    grid[size-2][size-2] = EMPTY  # 出口
+    cells[1 * size + 1] = EMPTY  # 入口
+    cells[(size - 2) * size + size - 2] = EMPTY  # 出口
     
-    return grid
+    return size, cells
 
-def is_path_available(grid, start, end):
-    """检查两点之间是否有路径（BFS算法）"""
+def label_regions(grid):
+    """
+    一次洪水填充给所有连通的空地区域编号
+
+    返回 (labels, region_count)，labels 按行展开（下标 y * size + x），墙壁为-1
+    """
     size = len(grid)
-    visited = [[False for _ in range(size)] for _ in range(size)]
-    queue = []
-    
-    # 初始化队列
-    queue.append(start)
-    visited[start[1]][start[0]] = True
-    
-    # BFS
-    while queue:
-        x, y = queue.pop(0)
-        
-        # 到达终点
-        if (x, y) == end:
-            return True
-        
-        # 检查四个方向
-        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < size and 0 <= ny < size:
-                if not visited[ny][nx] and grid[ny][nx] == EMPTY:
-                    visited[ny][nx] = True
-                    queue.append((nx, ny))
-    
-    return False
+    labels = [-1] * (size * size)
+    region_count = 0
+    queue = deque()
+    for y in range(size):
+        row = grid[y]
+        for x in range(size):
+            if row[x] != EMPTY or labels[y * size + x] >= 0:
+                continue
+            # 新区域
+            labels[y * size + x] = region_count
+            queue.append((x, y))
+            while queue:
+                cx, cy = queue.popleft()
+                for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                    if 0 <= nx < size and 0 <= ny < size and grid[ny][nx] == EMPTY and labels[ny * size + nx] < 0:
+                        labels[ny * size + nx] = region_count
+                        queue.append((nx, ny))
+            region_count += 1
+    return labels, region_count
+
+def repair_connectivity(grid, start=(1, 1)):
+    """
+    把所有空地区域连接到起点所在区域（原地修改grid）
 
-def ensure_connectivity(grid):
-    """确保所有点都连通"""
+    先用一次洪水填充给区域编号，再从起点区域出发做0-1 BFS（走空地代价0，打通墙壁代价1），
+    每到达一个新区域就打通路径上的墙壁并把该区域并入起点区域。
+    每个格子只被处理常数次，耗时与格子数成线性关系；外圈边界墙不会被打通
+
+    返回报告字典：regions（修复前的区域数）、merged（并入的区域数）、carved（打通的墙壁坐标）
+    """
     size = len(grid)
-    for i in range(1, size-1):
-        for j in range(1, size-1):
-            if grid[j][i] == EMPTY:
-                if not is_path_available(grid, (1, 1), (i, j)):
-                    # 连接不通的区域
-                    for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                        ni, nj = i + dx, j + dy
-                        if 0 <= ni < size and 0 <= nj < size and grid[nj][ni] == WALL:
-                            grid[nj][ni] = EMPTY
-                            break
-    return grid
\ No newline at end of file
+    start_x, start_y = start
+    if grid[start_y][start_x] != EMPTY:
+        grid[start_y][start_x] = EMPTY
+    labels, region_count = label_regions(grid)
+    report = {"regions": region_count, "merged": 0, "carved": []}
+    if region_count <= 1:
+        return report
+
+    members = [[] for _ in range(region_count)]
+    for index, label in enumerate(labels):
+        if label >= 0:
+            members[label].append(index)
+
+    connected = [False] * region_count
+    unreached = size * size + 1
+    dist = [unreached] * (size * size)  # 距离已连通部分需要打通的墙壁数
+    parent = [-1] * (size * size)
+    queue = deque()
+
+    def absorb(label):
+        """把一个区域并入已连通部分"""
+        connected[label] = True
+        for index in members[label]:
+            dist[index] = 0
+            queue.appendleft(index)
+
+    absorb(labels[start_y * size + start_x])
+    remaining = region_count - 1
+    while queue and remaining:
+        index = queue.popleft()
+        x, y = index % size, index // size
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if not (0 <= nx < size and 0 <= ny < size):
+                continue
+            neighbor = ny * size + nx
+            label = labels[neighbor]
+            if label >= 0:
+                if connected[label]:
+                    continue
+                # 到达新区域：沿路径打通墙壁
+                step = index
+                while dist[step] > 0:
+                    grid[step // size][step % size] = EMPTY
+                    report["carved"].append((step % size, step // size))
+                    dist[step] = 0
+                    queue.appendleft(step)
+                    step = parent[step]
+                absorb(label)
+                report["merged"] += 1
+                remaining -= 1
+            elif 1 <= nx < size - 1 and 1 <= ny < size - 1 and dist[index] + 1 < dist[neighbor]:
+                # 内部墙壁：打通代价+1
+                dist[neighbor] = dist[index] + 1
+                parent[neighbor] = index
+                queue.append(neighbor)
+    return report
@@ -0,0 +1,47 @@
+import numpy as np
+
+WALL = 1
+FULL_DENSITY = 255
+
+# 格子值到第0级数据的映射（墙壁255，其他0）
+_LEVEL0_TABLE = bytes(FULL_DENSITY if value == WALL else 0 for value in range(256))
+
+class WallPyramid:
+    """
+    墙壁网格的多级降采样金字塔
+
+    第0级每个格子一个字节（墙壁255，空地0），之后每一级边长减半，
+    每个值是对应2x2块内墙壁比例（0~255）。各级在首次使用时生成
+    """
+    def __init__(self, grid):
+        size = len(grid)
+        level0 = b"".join(bytes(row) for row in grid).translate(_LEVEL0_TABLE)
+        self._levels = [(size, level0)]
+
+    def level(self, index):
+        """返回第index级的 (边长, 数据)，数据按行优先排列"""
+        while len(self._levels) <= index:
+            self._levels.append(self._downsample(*self._levels[-1]))
+        return self._levels[index]
+
+    def level_count(self):
+        """降采样到1x1为止的总级数"""
+        side = self._levels[0][0]
+        count = 1
+        while side > 1:
+            side = (side + 1) // 2
+            count += 1
+        return count
+
+    @staticmethod
+    def _downsample(side, data):
+        """把边长为side的一级降采样为下一级（边长向上取整减半，越界部分不计入）"""
+        half = (side + 1) // 2
+        grid = np.frombuffer(data, dtype=np.uint8).reshape(side, side).astype(np.uint16)
+        counts = np.ones((side, side), dtype=np.uint16)
+        if side % 2:
+            grid = np.pad(grid, ((0, 1), (0, 1)))
+            counts = np.pad(counts, ((0, 1), (0, 1)))
+        totals = grid.reshape(half, 2, half, 2).sum(axis=(1, 3))
+        cells = counts.reshape(half, 2, half, 2).sum(axis=(1, 3))
+        return half, (totals // cells).astype(np.uint8).tobytes()
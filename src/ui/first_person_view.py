@@ -1,23 +1,84 @@
 from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPainter, QLinearGradient, QPainterPath, QColor, QBrush, QPen, QFont, QKeyEvent
+from PyQt6.QtCore import Qt, QRectF, QThreadPool
+from PyQt6.QtGui import QPainter, QLinearGradient, QPainterPath, QColor, QBrush, QPen, QFont, QImage, QPixmap
 import math
-import sys
+import time
+from ..systems.raycaster import (
+    RAY_CASTER_NUMPY, grid_to_array,
+    GridSnapshot, cast_columns, project_columns, column_depths, wall_brightness, FOV_DEGREES, MAX_DIST
+)
+from ..systems.sprites import SpriteIndex, sprite_view
+from .render_canvas import SceneCanvas, PainterCanvas
+from .ray_worker import RayJob
+from .frame_cache import FrameCache
+from ..systems.profiler import profiled
+from .wall_textures import (
+    WallTextureCache, WALL_DETAIL_BRICKS, WALL_DETAIL_TEXTURE,
+    TEXTURE_SIZE, brightness_band
+)
+from .sprite_textures import SpriteTextureCache, SPRITE_TEXTURE_SIZE, SPRITE_SCALES
+
+VIEW_WIDTH = 800
+VIEW_HEIGHT = 600
+
+# 渲染后端
+RENDER_BACKEND_SCENE = "scene"  # 每帧重建QGraphicsScene图元
+RENDER_BACKEND_PAINTER = "painter"  # 直接绘制到复用的离屏缓冲区，在paintEvent中贴图
 
 class FirstPersonView(QGraphicsView):
-    def __init__(self, game_map, parent=None):
+    def __init__(self, game_map, parent=None, backend=RENDER_BACKEND_PAINTER):
         super().__init__(parent)
+        # 按 (位置, 朝向, 地图版本) 缓存已渲染的画面；敌人/道具变化时只丢弃能看到变化格子的视角
+        self.frame_cache = FrameCache()
+        self._entity_position = 0
+        
+        # 后台射线计算：开启后射线在线程池中计算，界面线程只负责绘制
+        self.async_rays = False
+        self._thread_pool = QThreadPool()
+        self._thread_pool.setMaxThreadCount(1)
+        self._job_counter = 0  # 最新请求的任务编号，结果编号不一致即为过期
+        self._running_job = None  # (任务, 请求参数)
+        self._queued_request = None  # 任务运行期间到达的最新请求
+        
         self.game_map = game_map
         self.setScene(QGraphicsScene())
+        self.scene().setSceneRect(0, 0, VIEW_WIDTH, VIEW_HEIGHT)
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setStyleSheet("background:black;")
-        self.setFixedSize(800, 600)
+        self.setFixedSize(VIEW_WIDTH, VIEW_HEIGHT)
+        
+        # 渲染后端与离屏缓冲区
+        self.backend = backend
+        self.frame_buffer = None
+        self.current_frame = None  # 当前显示的画面（离屏缓冲区或缓存帧）
+        self._text_documents = {}
         
         # 视角相关
         self.player_dir = 0  # 0: North, 90: East, 180: South, 270: West
         
+        # 射线投射模式（"numpy" 批量投射，"dda" 精确网格遍历，"march" 固定步长步进）
+        self.ray_caster = RAY_CASTER_NUMPY
+        self.num_rays = 120  # 射线数量（屏幕列数）
+        
+        # 墙壁细节（"texture" 纹理贴图，"bricks" 砖缝线条，"flat" 纯色）
+        self.wall_detail = WALL_DETAIL_TEXTURE
+        self.wall_textures = WallTextureCache()
+        
+        # 敌人和道具的广告牌精灵
+        self.show_sprites = True
+        self.sprite_textures = SpriteTextureCache()
+        
+        # 渲染分辨率缩放与抗锯齿（由渲染质量控制器调整）
+        self.render_scale = 1.0
+        self.antialiasing = True
+        self.quality_governor = None
+        self.last_render_ms = 0.0
+        
+        # 性能统计（由游戏主窗口设置）
+        self.profiler = None
+        
         # 添加出口提示
         self.show_exit_prompt = False
         
@@ -28,120 +89,386 @@ class FirstPersonView(QGraphicsView):
         if self.game_map is not None:
             self.render_view()
 
+    @property
+    def game_map(self):
+        return self._game_map
+
+    @game_map.setter
+    def game_map(self, game_map):
+        """切换地图时丢弃基于旧地图的缓存"""
+        self._game_map = game_map
+        self._grid_array = None
+        self._grid_snapshot = None
+        self.sprite_index = SpriteIndex(game_map) if game_map is not None else None
+        self.cancel_pending_frame()
+        self.frame_cache.clear()
+        if game_map is not None and hasattr(game_map, 'entity_change_position'):
+            self._entity_position = game_map.entity_change_position()
+
+    def set_quality_governor(self, governor):
+        """设置渲染质量控制器，并立即应用其当前等级"""
+        self.quality_governor = governor
+        if governor is not None:
+            self.apply_quality(governor.level)
+
+    def apply_quality(self, level):
+        """应用渲染质量等级（射线数量、墙壁细节、渲染分辨率）"""
+        self.num_rays = level['num_rays']
+        self.wall_detail = level['wall_detail']
+        self.render_scale = level['render_scale']
+        self.antialiasing = level['antialiasing']
+
+    def begin_frame(self):
+        """开始新的一帧，返回绘制目标"""
+        if self.backend == RENDER_BACKEND_PAINTER:
+            # 按渲染分辨率分配缓冲区，绘制时仍使用800x600的逻辑坐标
+            width = max(1, int(VIEW_WIDTH * self.render_scale))
+            height = max(1, int(VIEW_HEIGHT * self.render_scale))
+            if self.frame_buffer is None or self.frame_buffer.width() != width or self.frame_buffer.height() != height:
+                self.frame_buffer = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+            self.frame_buffer.fill(QColor(0, 0, 0))
+            painter = QPainter(self.frame_buffer)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.antialiasing)
+            if self.render_scale != 1.0:
+                painter.scale(width / VIEW_WIDTH, height / VIEW_HEIGHT)
+            return PainterCanvas(painter, self._text_documents)
+        
+        # 清空场景
+        self.scene().clear()
+        return SceneCanvas(self.scene())
+
+    def end_frame(self, canvas):
+        """结束当前帧并请求重绘"""
+        if isinstance(canvas, PainterCanvas):
+            canvas.painter.end()
+            self.show_frame(self.frame_buffer)
+
+    def show_frame(self, frame):
+        """显示一帧画面（QImage或QPixmap）"""
+        self.current_frame = frame
+        self.viewport().update()
+
+    def drawBackground(self, painter, rect):
+        """在paintEvent中把离屏缓冲区贴到视图上"""
+        super().drawBackground(painter, rect)
+        if self.backend != RENDER_BACKEND_PAINTER or self.current_frame is None:
+            return
+        # 低分辨率渲染的画面在这里放大到视图大小
+        target = QRectF(0, 0, VIEW_WIDTH, VIEW_HEIGHT)
+        if isinstance(self.current_frame, QPixmap):
+            painter.drawPixmap(target, self.current_frame, QRectF(self.current_frame.rect()))
+        else:
+            painter.drawImage(target, self.current_frame)
+
+    def frame_key(self, px, py):
+        """当前画面的缓存键（仅离屏缓冲区后端可缓存）"""
+        if self.backend != RENDER_BACKEND_PAINTER:
+            return None
+        return (
+            round(px * 10), round(py * 10), self.player_dir,
+            getattr(self.game_map, 'version', 0),
+            self.num_rays, self.ray_caster, self.wall_detail,
+            self.render_scale, self.antialiasing, self.show_sprites,
+        )
+
+    def sync_entity_changes(self):
+        """
+        按地图的敌人/道具变化记录丢弃受影响的缓存帧
+
+        只丢弃变化格子落在其视锥内（精灵可能出现在画面中）的视角，
+        视野外或远处怪物的移动不影响其他缓存帧；变化记录不可用时清空缓存
+        """
+        if not hasattr(self.game_map, 'entity_changes_since'):
+            return
+        changes = self.game_map.entity_changes_since(self._entity_position)
+        self._entity_position = self.game_map.entity_change_position()
+        if changes is None:
+            self.frame_cache.clear()
+            return
+        if not changes:
+            return
+        cells = set(changes)
+        half_fov = math.radians(FOV_DEGREES) / 2
+
+        def affected(key):
+            # 缓存键的前三项是量化到0.1格的位置和朝向；视锥略微放宽，抵消位置量化的误差
+            px, py, facing = key[0] / 10, key[1] / 10, math.radians(key[2])
+            return any(sprite_view(px, py, facing, half_fov, x, y, MAX_DIST + 1, half_width=0.6) is not None
+                       for x, y in cells)
+
+        self.frame_cache.discard_where(affected)
+
+    def show_message(self, text, font, color, x=0, y=0):
+        """清空画面并只显示一条文字（如战斗提示）"""
+        # 尚未返回的后台结果不能再覆盖这条文字
+        self.cancel_pending_frame()
+        canvas = self.begin_frame()
+        try:
+            canvas.draw_text(text, font, color, x, y)
+        finally:
+            self.end_frame(canvas)
+
+    @profiled("render_view")
     def render_view(self):
         """渲染第一人称视角"""
         if self.game_map is None:
             return
-            
+        
+        # 获取玩家位置
+        px, py = self.game_map.player_x, self.game_map.player_y
+        
+        # 检查玩家位置有效性
+        if px < 0 or py < 0 or px >= self.game_map.size or py >= self.game_map.size:
+            px, py = 1, 1
+        
+        # 检查是否靠近出口
+        exit_x, exit_y = self.game_map.exit_point
+        dist_to_exit = math.sqrt((px - exit_x)**2 + (py - exit_y)**2)
+        self.show_exit_prompt = dist_to_exit < 1.5
+        
+        # 重复的视角直接使用缓存帧
+        frame_key = self.frame_key(px, py)
+        if frame_key is not None:
+            self.sync_entity_changes()
+            cached_frame = self.frame_cache.get(frame_key)
+            if cached_frame is not None:
+                self.cancel_pending_frame()
+                self.show_frame(cached_frame)
+                return
+        
+        # 需要投射射线时交给后台线程，结果返回后再绘制
+        if self.async_rays and not self.has_cached_columns(px, py, self.num_rays):
+            self.request_frame(px, py, frame_key)
+            return
+        
+        self.cancel_pending_frame()
+        self.render_sync(px, py, frame_key)
+    
+    def render_sync(self, px, py, frame_key):
+        """在界面线程中投射射线并绘制一帧"""
+        compute_start = time.perf_counter()
         try:
-            # 记录当前焦点项
-            current_focus = self.scene().focusItem()
-            
-            # 清空场景
-            self.scene().clear()
-            
-            # 获取玩家位置
-            px, py = self.game_map.player_x, self.game_map.player_y
-            
-            # 检查玩家位置有效性
-            if px < 0 or py < 0 or px >= self.game_map.size or py >= self.game_map.size:
-                px, py = 1, 1
-            
-            # 天空盒 - 渐变蓝色
-            sky_gradient = QLinearGradient(0, 0, 0, 300)
-            sky_gradient.setColorAt(0, QColor(20, 20, 100))
-            sky_gradient.setColorAt(1, QColor(60, 60, 180))
-            self.scene().addRect(0, 0, 800, 300, QPen(Qt.GlobalColor.darkBlue), QBrush(sky_gradient))
-
-            # 地面 - 草地
-            ground_brush = QBrush(QColor(0, 80, 0))
-            self.scene().addRect(0, 500, 800, 100, QPen(Qt.GlobalColor.darkGreen), ground_brush)
-
-            # 伪3D墙壁渲染
-            num_rays = 120  # 射线数量
-            for i in range(num_rays):
-                # 计算射线角度 (视野范围60度)
-                ray_angle = math.radians(self.player_dir + 30 * (i / num_rays - 0.5))
-                sin_a = math.sin(ray_angle)
-                cos_a = math.cos(ray_angle)
-                
-                # 检测墙壁
-                wall_hit = self.cast_ray(px, py, sin_a, cos_a)
-                
-                if wall_hit:
-                    x, y, dist, wall_type = wall_hit
-                    
-                    # 透视投影计算
-                    wall_height = min(800, 400 / max(0.1, dist))
-                    wall_top = 300 - wall_height / 2
-                    wall_width = 800 / num_rays
-                    wall_x = i * wall_width
-                    
-                    # 根据距离和类型调整颜色
-                    if wall_type == "vertical":
-                        base_color = QColor(100, 100, 100)
-                        texture_offset = x
-                    else:  # horizontal
-                        base_color = QColor(120, 120, 120)
-                        texture_offset = y
-                    
-                    # 根据距离调整亮度
-                    brightness_factor = max(0.3, 1 - dist / 10)
-                    r = int(base_color.red() * brightness_factor)
-                    g = int(base_color.green() * brightness_factor)
-                    b = int(base_color.blue() * brightness_factor)
-                    wall_color = QColor(r, g, b)
-                    
-                    # 绘制墙壁
-                    self.draw_wall_trapezoid(wall_x, wall_top, wall_width, wall_height, wall_color, wall_type, texture_offset)
-            
-            # 检查是否靠近出口
-            self.show_exit_prompt = False
-            exit_x, exit_y = self.game_map.exit_point
-            dist_to_exit = math.sqrt((px - exit_x)**2 + (py - exit_y)**2)
+            columns = self.compute_columns(px, py, self.num_rays)
+            slices = project_columns(columns, self.num_rays)
+            depths = column_depths(columns)
+        except Exception as e:
+            print(f"渲染视图出错: {e}")
+            self.show_message(f"渲染错误: {str(e)}", QFont("Arial", 16), QColor(255, 100, 100), 200, 300)
+            return
+        self.paint_frame(slices, depths, px, py, frame_key, (time.perf_counter() - compute_start) * 1000)
+    
+    def paint_frame(self, slices, depths, px, py, frame_key, compute_ms=0.0):
+        """在界面线程中绘制一帧（墙壁切片和深度缓冲已计算好）"""
+        # 记录当前焦点项
+        current_focus = self.scene().focusItem()
+        
+        rendered = False
+        paint_start = time.perf_counter()
+        canvas = self.begin_frame()
+        try:
+            self.draw_scene(canvas, slices)
+            if self.show_sprites:
+                self.draw_sprites(canvas, depths, px, py)
             
-            if dist_to_exit < 1.5:
-                self.show_exit_prompt = True
-                prompt_text = self.scene().addText("🚪 按 E 进入下一关", QFont("Microsoft YaHei", 24))
-                prompt_text.setDefaultTextColor(QColor(255, 255, 100))
-                prompt_text.setPos(250, 400)
+            # 出口提示
+            if self.show_exit_prompt:
+                canvas.draw_text("🚪 按 E 进入下一关", QFont("Microsoft YaHei", 24), QColor(255, 255, 100), 250, 400)
             
             # 恢复焦点
             if current_focus:
                 current_focus.setFocus()
+            rendered = True
                 
         except Exception as e:
             print(f"渲染视图出错: {e}")
             # 添加错误提示
-            error_text = self.scene().addText(f"渲染错误: {str(e)}", QFont("Arial", 16))
-            error_text.setDefaultTextColor(QColor(255, 100, 100))
-            error_text.setPos(200, 300)
+            canvas.draw_text(f"渲染错误: {str(e)}", QFont("Arial", 16), QColor(255, 100, 100), 200, 300)
+        finally:
+            self.end_frame(canvas)
+        
+        # 缓存本帧
+        if rendered and frame_key is not None:
+            self.frame_cache.put(frame_key, QPixmap.fromImage(self.frame_buffer))
+        
+        # 统计场景图元数量
+        if self.profiler is not None:
+            self.profiler.count("scene_items", len(self.scene().items()))
+        
+        # 记录耗时（射线计算 + 绘制），必要时调整下一帧的渲染质量
+        self.last_render_ms = compute_ms + (time.perf_counter() - paint_start) * 1000
+        if rendered and self.quality_governor is not None:
+            if self.quality_governor.record(self.last_render_ms):
+                self.apply_quality(self.quality_governor.level)
     
-    def cast_ray(self, px, py, sin_a, cos_a):
-        """投射射线并返回与墙壁的交点"""
-        try:
-            step = 0.1
-            max_dist = 10
-            dist = step
+    def draw_scene(self, canvas, slices):
+        """绘制天空、地面和墙壁切片"""
+        # 天空盒 - 渐变蓝色
+        sky_gradient = QLinearGradient(0, 0, 0, 300)
+        sky_gradient.setColorAt(0, QColor(20, 20, 100))
+        sky_gradient.setColorAt(1, QColor(60, 60, 180))
+        canvas.draw_rect(0, 0, 800, 300, QPen(Qt.GlobalColor.darkBlue), QBrush(sky_gradient))
+
+        # 地面 - 草地
+        ground_brush = QBrush(QColor(0, 80, 0))
+        canvas.draw_rect(0, 500, 800, 100, QPen(Qt.GlobalColor.darkGreen), ground_brush)
+
+        # 伪3D墙壁渲染
+        for wall_x, wall_top, wall_width, wall_height, wall_type, texture_offset, brightness, rgb in slices:
+            if self.wall_detail == WALL_DETAIL_TEXTURE:
+                self.draw_wall_texture(canvas, wall_x, wall_top, wall_width, wall_height, wall_type, texture_offset, brightness)
+                continue
             
-            while dist <= max_dist:
-                # 计算射线上的点
-                x = px + dist * cos_a
-                y = py + dist * sin_a
-                
-                # 检查是否击中墙壁
-                if self.game_map.is_wall(int(x), int(y)):
-                    wall_type = "vertical" if abs(cos_a) > abs(sin_a) else "horizontal"
-                    return (x, y, dist, wall_type)
-                
-                dist += step
+            # 绘制墙壁
+            self.draw_wall_trapezoid(canvas, wall_x, wall_top, wall_width, wall_height, QColor(*rgb), wall_type, texture_offset,
+                                     bricks=self.wall_detail == WALL_DETAIL_BRICKS)
+    
+    def draw_sprites(self, canvas, depths, px, py):
+        """
+        用深度缓冲绘制视锥内的敌人和道具
+
+        每个精灵按屏幕列检查是否被墙壁遮挡，连续的可见列合并为一次贴图
+        """
+        if self.sprite_index is None or not depths:
+            return
+        sprites = self.sprite_index.query_frustum(px, py, self.player_dir)
+        if self.profiler is not None:
+            self.profiler.count("visible_sprites", len(sprites))
+        
+        num_columns = len(depths)
+        column_width = 800 / num_columns
+        fov = math.radians(FOV_DEGREES)
+        for dist, offset, kind in sprites:
+            # 与墙壁相同的透视投影，精灵底部贴地
+            unit_height = min(800, 400 / dist)
+            size = unit_height * SPRITE_SCALES[kind]
+            left = (offset / fov + 0.5) * 800 - size / 2
+            top = 300 + unit_height / 2 - size
+            texture = self.sprite_textures.get(kind, brightness_band(wall_brightness(dist)))
             
-            return None
+            first = max(0, int(left / column_width))
+            last = min(num_columns - 1, int((left + size) / column_width))
+            run_start = None
+            for column in range(first, last + 2):
+                visible = column <= last and dist < depths[column]
+                if visible and run_start is None:
+                    run_start = column
+                elif not visible and run_start is not None:
+                    self.draw_sprite_run(canvas, texture, left, top, size,
+                                         run_start * column_width, column * column_width)
+                    run_start = None
+    
+    def draw_sprite_run(self, canvas, texture, left, top, size, run_left, run_right):
+        """绘制精灵在 [run_left, run_right) 屏幕范围内可见的部分"""
+        x0 = max(left, run_left)
+        x1 = min(left + size, run_right)
+        if x1 <= x0:
+            return
+        scale = SPRITE_TEXTURE_SIZE / size
+        canvas.draw_image(x0, top, x1 - x0, size, texture,
+                          (x0 - left) * scale, 0, (x1 - x0) * scale, SPRITE_TEXTURE_SIZE)
+    
+    def lookup_table(self, num_rays):
+        """当前朝向和列数可用的射线命中表，不可用时返回None"""
+        ray_table = getattr(self.game_map, 'ray_table', None)
+        if ray_table is not None and ray_table.supports(self.player_dir, num_rays):
+            return ray_table
+        return None
+
+    def has_cached_columns(self, px, py, num_rays):
+        """当前视角的命中结果是否已在射线命中表中（查表无需投射射线）"""
+        ray_table = self.lookup_table(num_rays)
+        return ray_table is not None and ray_table.has(px, py, self.player_dir, num_rays)
+    
+    def compute_columns(self, px, py, num_rays):
+        """
+        计算每个屏幕列的墙壁命中信息
+
+        返回长度为num_rays的列表，元素为 (dist, wall_type, texture_offset, brightness)，
+        未击中墙壁的列为None
+        """
+        # 地图启用了射线命中表时直接查表
+        ray_table = self.lookup_table(num_rays)
+        if ray_table is not None:
+            return ray_table.lookup(px, py, self.player_dir, num_rays)
+        
+        grid_array = None
+        if self.ray_caster == RAY_CASTER_NUMPY:
+            if self._grid_array is None:
+                if hasattr(self.game_map, 'grid_array'):
+                    self._grid_array = self.game_map.grid_array()
+                else:
+                    self._grid_array = grid_to_array(self.game_map.grid)
+            grid_array = self._grid_array
+        return cast_columns(self.game_map, px, py, self.player_dir, num_rays, self.ray_caster, grid_array)
+
+    def request_frame(self, px, py, frame_key):
+        """提交后台射线计算；已有任务在运行时只保留最新的请求"""
+        self._job_counter += 1
+        request = (self._job_counter, px, py, self.player_dir, self.num_rays, self.ray_caster, frame_key)
+        if self._running_job is not None:
+            self._queued_request = request
+            return
+        self._start_job(request)
+
+    def _start_job(self, request):
+        job_id, px, py, player_dir, num_rays, ray_caster, frame_key = request
+        # 地图在一关内是静态的，快照每张地图只生成一次
+        if self._grid_snapshot is None:
+            self._grid_snapshot = GridSnapshot(self.game_map.grid)
+        # 启用了射线命中表时由工作线程填表，之后回到该视角可直接查表
+        ray_table = getattr(self.game_map, 'ray_table', None)
+        if ray_table is not None and not ray_table.supports(player_dir, num_rays):
+            ray_table = None
+        job = RayJob(job_id, self._grid_snapshot, px, py, player_dir, num_rays, ray_caster, ray_table)
+        job.signals.finished.connect(self._on_job_finished)
+        # 保持引用直到结果返回
+        self._running_job = (job, request)
+        self._thread_pool.start(job)
+
+    def _on_job_finished(self, job_id, result, compute_ms):
+        """后台任务完成（在界面线程中调用）"""
+        job, request = self._running_job
+        self._running_job = None
+        if self._queued_request is not None:
+            request = self._queued_request
+            self._queued_request = None
+            self._start_job(request)
+        
+        if self.profiler is not None and self.profiler.enabled:
+            self.profiler.record("ray_worker", compute_ms)
+        
+        # 视角或地图已经变化，丢弃过期结果
+        if job_id != self._job_counter:
+            return
+        _, px, py, _, _, _, frame_key = request
+        if result is None:
+            # 后台计算出错，改为同步计算，避免画面停留在旧视角
+            print(f"后台射线任务 {job_id} 失败，改为在界面线程中计算")
+            self.render_sync(px, py, frame_key)
+            return
+        slices, depths = result
+        self.paint_frame(slices, depths, px, py, frame_key, compute_ms)
+
+    def cancel_pending_frame(self):
+        """使所有尚未返回的后台结果失效"""
+        self._job_counter += 1
+        self._queued_request = None
+
+    def shutdown(self):
+        """等待后台射线任务结束"""
+        self.cancel_pending_frame()
+        self._thread_pool.waitForDone(1000)
+
+    def draw_wall_texture(self, canvas, x, y, width, height, wall_type, texture_offset, brightness):
+        """用预生成的砖墙纹理绘制一列墙壁（单次缩放贴图）"""
+        try:
+            texture = self.wall_textures.get(wall_type, brightness_band(brightness))
+            texture_x = int((texture_offset % 1.0) * TEXTURE_SIZE) % TEXTURE_SIZE
+            canvas.draw_image(x, y, width, height, texture, texture_x, 0, 1, TEXTURE_SIZE)
         except Exception as e:
-            print(f"射线投射错误: {e}")
-            return None
+            print(f"绘制墙壁纹理错误: {e}")
 
-    def draw_wall_trapezoid(self, x, y, width, height, color, wall_type, texture_offset):
+    def draw_wall_trapezoid(self, canvas, x, y, width, height, color, wall_type, texture_offset, bricks=True):
         """绘制梯形墙壁（模拟透视效果）"""
         try:
             # 顶部宽度
@@ -161,10 +488,10 @@ class FirstPersonView(QGraphicsView):
             path.closeSubpath()
             
             # 绘制墙壁
-            self.scene().addPath(path, QPen(color.darker(150)), QBrush(color))
+            canvas.draw_path(path, QPen(color.darker(150)), QBrush(color))
             
             # 添加砖墙纹理
-            if height > 30:
+            if bricks and height > 30:
                 brick_height = 8
                 num_bricks = max(1, int(height / brick_height))
                 
@@ -173,11 +500,11 @@ class FirstPersonView(QGraphicsView):
                     offset = 0 if (i + int(texture_offset * 2)) % 2 == 0 else width * 0.25
                     
                     if i > 0:
-                        self.scene().addLine(x, brick_y, x + width, brick_y, QPen(QColor(50, 50, 50), 0.5))
+                        canvas.draw_line(x, brick_y, x + width, brick_y, QPen(QColor(50, 50, 50), 0.5))
                     
                     for j in range(1, int(width / 15) + 1):
                         brick_x = x + j * 15 + offset
                         if brick_x <= x + width:
-                            self.scene().addLine(brick_x, brick_y, brick_x, brick_y + brick_height, QPen(QColor(50, 50, 50), 0.3))
+                            canvas.draw_line(brick_x, brick_y, brick_x, brick_y + brick_height, QPen(QColor(50, 50, 50), 0.3))
         except Exception as e:
             print(f"绘制墙壁错误: {e}")
\ No newline at end of file
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+
+class FrameCache:
+    """按视角姿态缓存已渲染的画面（LRU，按内存预算淘汰）"""
+    def __init__(self, budget_bytes=64 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+
+    @staticmethod
+    def pixmap_bytes(pixmap):
+        """估算一张QPixmap占用的内存"""
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth()) // 8
+
+    def get(self, key):
+        """查找缓存帧，命中时移动到最近使用位置"""
+        entry = self._frames.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._frames.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, pixmap):
+        """加入缓存帧，超出内存预算时淘汰最久未使用的帧"""
+        size = self.pixmap_bytes(pixmap)
+        if size > self.budget_bytes:
+            return
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self.memory_bytes -= old[1]
+        self._frames[key] = (pixmap, size)
+        self.memory_bytes += size
+        while self.memory_bytes > self.budget_bytes:
+            _, (_, evicted_size) = self._frames.popitem(last=False)
+            self.memory_bytes -= evicted_size
+
+    def discard_where(self, predicate):
+        """丢弃键满足predicate的缓存帧，返回丢弃的帧数"""
+        stale = [key for key in self._frames if predicate(key)]
+        for key in stale:
+            _, size = self._frames.pop(key)
+            self.memory_bytes -= size
+        return len(stale)
+
+    def clear(self):
+        """清空缓存（保留命中统计）"""
+        self._frames.clear()
+        self.memory_bytes = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def stats_text(self):
+        """开发者面板显示的统计信息"""
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0
+        return (f"帧缓存: 命中 {self.hits} / 未命中 {self.misses} ({hit_rate:.0f}%)，"
+                f"{len(self._frames)} 帧 {self.memory_bytes / (1024 * 1024):.1f}MB")
@@ -1,105 +1,441 @@
-from PyQt6.QtWidgets import QScrollArea, QWidget, QTableWidget, QVBoxLayout, QFrame, QTableWidgetItem
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QColor, QResizeEvent, QBrush, QPen
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, pyqtSignal, QRect, QRectF
+from PyQt6.QtGui import QColor, QPainter, QPixmap, QImage, QRegion
+from ..systems.profiler import profiled
+from ..systems.wall_pyramid import WallPyramid, FULL_DENSITY
 
-class MinimapWidget(QScrollArea):
+# 小地图颜色
+BACKGROUND_COLOR = QColor("#222222")
+GRID_LINE_COLOR = QColor("#444444")
+WALL_COLOR = QColor("#555555")
+FLOOR_COLOR = QColor("#333333")
+PLAYER_COLOR = QColor("#ff5555")
+ENEMY_COLOR = QColor("#ff9999")
+ITEM_COLOR = QColor("#55ff55")
+EXIT_COLOR = QColor("#ffcc00")
+FOG_COLOR = QColor("#111111")  # 未探索区域
+
+MAX_CELL_SIZE = 25  # 单元格最大边长（像素）
+GRID_LINE_MIN_CELL = 4  # 单元格小于此边长时不画网格线
+
+# 显示模式
+MINIMAP_MODE_AUTO = "auto"  # 地图放得下时显示全图，否则显示玩家周围
+MINIMAP_MODE_FULL = "full"  # 全图，每个格子完整细节
+MINIMAP_MODE_VIEWPORT = "viewport"  # 只显示玩家周围的窗口
+MINIMAP_MODE_OVERVIEW = "overview"  # 降采样的全图概览
+MINIMAP_MODES = (MINIMAP_MODE_AUTO, MINIMAP_MODE_FULL, MINIMAP_MODE_VIEWPORT, MINIMAP_MODE_OVERVIEW)
+
+AUTO_FULL_MIN_CELL = 6  # 自动模式下全图单元格至少这么大，否则切换为窗口模式
+VIEWPORT_CELLS = 21  # 窗口模式显示的格子数（边长）
+OVERVIEW_MIN_CELL = 2  # 概览模式每个块至少占的像素
+
+def density_gray_table():
+    """墙壁比例（0~255）到灰度值的映射表，两端分别为空地和墙壁的颜色"""
+    floor = FLOOR_COLOR.red()
+    wall = WALL_COLOR.red()
+    return bytes(floor + (wall - floor) * d // FULL_DENSITY for d in range(256))
+
+DENSITY_GRAY = density_gray_table()
+
+class MinimapWidget(QWidget):
+    """
+    自绘小地图
+
+    静态的墙壁布局每张地图（和每种单元格大小）只栅格化一次并缓存为图像，
+    每次重绘只在其上叠加玩家、敌人、道具和出口标记。
+
+    render() 对比上次绘制时的玩家格子和地图变化记录，只请求重绘状态发生变化的格子。
+
+    大地图使用窗口模式（只画玩家周围）或概览模式（按金字塔降采样），
+    每次绘制的代价与地图大小无关。右键点击切换显示模式。
+
+    未探索的格子被迷雾图层（每格一个像素的索引色图像）覆盖，不显示其中的标记
+    """
     map_clicked = pyqtSignal(int, int)
-    
+
     def __init__(self, game_map):
         super().__init__()
+        self.profiler = None
+        self.mode = MINIMAP_MODE_AUTO
+        self._wall_pixmap = None
+        self._wall_cell_size = 0
+        self._markers = None  # (x, y) -> 标记颜色（敌人、道具、出口）
+        self._change_position = 0
+        self._player_cell = None
+        self._queued_rects = []  # render() 请求重绘、尚未绘制的格子矩形
         self.game_map = game_map
-        self.setWidgetResizable(True)
-        
-        # 创建内容小部件
-        self.content_widget = QWidget()
-        self.setWidget(self.content_widget)
-        
-        # 设置内容小部件的布局
-        self.content_layout = QVBoxLayout(self.content_widget)
-        self.content_layout.setContentsMargins(0, 0, 0, 0)
-        self.content_layout.setSpacing(0)
-        
-        # 创建表格
-        self.table = QTableWidget()
-        self.table.verticalHeader().setVisible(False)
-        self.table.horizontalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
-        self.table.setStyleSheet("background:#222; gridline-color: #444;")
-        
-        # 连接点击事件
-        self.table.cellClicked.connect(self.on_cell_clicked)
-        
-        self.content_layout.addWidget(self.table)
-    
-    def on_cell_clicked(self, row, column):
-        """处理表格单元格点击事件"""
-        self.map_clicked.emit(column, row)
-    
-    def mousePressEvent(self, event):
-        """处理鼠标点击事件"""
-        super().mousePressEvent(event)
-    
-    def resizeEvent(self, event: QResizeEvent):
-        """窗口大小变化时自动调整"""
-        super().resizeEvent(event)
-        self.render()
+        self.setMinimumSize(60, 60)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setToolTip("右键切换显示模式")
 
-    def render(self):
+    @property
+    def game_map(self):
+        return self._game_map
+
+    @game_map.setter
+    def game_map(self, game_map):
+        """切换地图时丢弃旧地图的墙壁图像"""
+        self._game_map = game_map
+        self._wall_pixmap = None
+        self._pyramid = None
+        self._level_images = {}
+        self._fog_image = None
+        self._markers = None
+        self._player_cell = None
+        self.update()
+
+    def set_mode(self, mode):
+        """设置显示模式"""
+        if mode in MINIMAP_MODES and mode != self.mode:
+            self.mode = mode
+            self.update()
+
+    def active_mode(self):
+        """实际使用的显示模式（解析自动模式）"""
+        if self.mode != MINIMAP_MODE_AUTO:
+            return self.mode
+        if self.game_map.size * AUTO_FULL_MIN_CELL <= min(self.width(), self.height()):
+            return MINIMAP_MODE_FULL
+        return MINIMAP_MODE_VIEWPORT
+
+    def cell_size(self):
+        """当前窗口大小下的单元格边长"""
         size = self.game_map.size
-        self.table.setRowCount(size)
-        self.table.setColumnCount(size)
-        
-        # 计算最佳单元格大小
-        area_width = self.table.width()
-        area_height = self.table.height()
-        cell_size = min(area_width // size, area_height // size, 25)
-        
-        # 设置行高和列宽
-        for i in range(size):
-            self.table.setRowHeight(i, cell_size)
-            self.table.setColumnWidth(i, cell_size)
-        
-        # 清空表格
-        self.table.clearContents()
-        
-        # 填充地图格子
-        for y in range(size):
-            for x in range(size):
-                item = self.table.item(y, x)
-                if item is None:
-                    item = QTableWidgetItem()
-                
-                if self.game_map.is_wall(x, y):
-                    item.setBackground(QColor("#555555"))
-                else:
-                    item.setBackground(QColor("#333333"))
-                self.table.setItem(y, x, item)
+        return max(1, min(self.width() // size, self.height() // size, MAX_CELL_SIZE))
 
-        # 标记玩家位置
-        px, py = int(self.game_map.player_x), int(self.game_map.player_y)
-        if 0 <= px < size and 0 <= py < size:
-            player_item = self.table.item(py, px)
-            if player_item:
-                player_item.setBackground(QColor("#ff5555"))
+    def cell_rect(self, x, y, cell_size, origin=(0, 0)):
+        """单元格内部（不含网格线）的屏幕矩形，origin 为绘制区域左上角对应的格子"""
+        gap = 1 if cell_size >= GRID_LINE_MIN_CELL else 0
+        return QRect((x - origin[0]) * cell_size + gap, (y - origin[1]) * cell_size + gap,
+                     cell_size - gap, cell_size - gap)
+
+    def pyramid(self):
+        if self._pyramid is None:
+            self._pyramid = WallPyramid(self.game_map.grid)
+        return self._pyramid
+
+    def level_image(self, level):
+        """金字塔第level级的灰度图像（每个块一个像素）"""
+        image = self._level_images.get(level)
+        if image is None:
+            side, data = self.pyramid().level(level)
+            pixels = data.translate(DENSITY_GRAY)
+            image = QImage(pixels, side, side, side, QImage.Format.Format_Grayscale8).copy()
+            self._level_images[level] = image
+        return image
+
+    def is_cell_explored(self, x, y):
+        explored = getattr(self.game_map, 'explored', None)
+        return explored is None or explored[y * self.game_map.size + x] == 1
+
+    def fog_image(self):
+        """迷雾图层：每格一个像素，未探索为迷雾色，已探索为透明"""
+        explored = getattr(self.game_map, 'explored', None)
+        if explored is None:
+            return None
+        if self._fog_image is None:
+            size = self.game_map.size
+            image = QImage(bytes(explored), size, size, size, QImage.Format.Format_Indexed8).copy()
+            image.setColorTable([FOG_COLOR.rgba(), 0])
+            self._fog_image = image
+        return self._fog_image
+
+    def draw_fog(self, painter, target, source=None):
+        """在target矩形上叠加迷雾图层（source为对应的格子范围）"""
+        fog = self.fog_image()
+        if fog is None:
+            return
+        if source is None:
+            painter.drawImage(target, fog)
+        else:
+            painter.drawImage(target, fog, source)
 
-        # 标记敌人
+    def draw_grid_lines(self, painter, cells, cell_size):
+        """在 cells x cells 个格子的区域上画网格线"""
+        if cell_size < GRID_LINE_MIN_CELL:
+            return
+        painter.setPen(GRID_LINE_COLOR)
+        extent = cells * cell_size
+        for i in range(cells + 1):
+            painter.drawLine(i * cell_size, 0, i * cell_size, extent)
+            painter.drawLine(0, i * cell_size, extent, i * cell_size)
+
+    def wall_pixmap(self, cell_size):
+        """获取全图模式的墙壁布局图像，地图或单元格大小变化时重新栅格化"""
+        if self._wall_pixmap is None or self._wall_cell_size != cell_size:
+            size = self.game_map.size
+            pixmap = QPixmap(size * cell_size + 1, size * cell_size + 1)
+            pixmap.fill(GRID_LINE_COLOR)
+            painter = QPainter(pixmap)
+            painter.drawImage(QRect(0, 0, size * cell_size, size * cell_size), self.level_image(0))
+            self.draw_grid_lines(painter, size, cell_size)
+            painter.end()
+            self._wall_pixmap = pixmap
+            self._wall_cell_size = cell_size
+        return self._wall_pixmap
+
+    def viewport_layout(self):
+        """窗口模式的 (左上角格子, 窗口边长, 单元格边长)"""
+        size = self.game_map.size
+        cells = min(VIEWPORT_CELLS, size)
+        cell_size = max(1, min(min(self.width(), self.height()) // cells, MAX_CELL_SIZE))
+        px, py = self._player_cell or self.player_cell() or (0, 0)
+        origin_x = max(0, min(size - cells, px - cells // 2))
+        origin_y = max(0, min(size - cells, py - cells // 2))
+        return (origin_x, origin_y), cells, cell_size
+
+    def overview_layout(self):
+        """概览模式的 (金字塔级别, 块数边长, 块边长像素)"""
+        extent = min(self.width(), self.height())
+        pyramid = self.pyramid()
+        level = 0
+        side = self.game_map.size
+        while side * OVERVIEW_MIN_CELL > extent and level < pyramid.level_count() - 1:
+            level += 1
+            side = (side + 1) // 2
+        return level, side, max(1, min(extent // side, MAX_CELL_SIZE))
+
+    def marker_color(self, x, y):
+        """某个格子上的标记颜色（出口 > 道具 > 敌人），没有标记时返回None"""
+        if (x, y) == tuple(self.game_map.exit_point):
+            return EXIT_COLOR
+        if self.game_map.get_item_at(x, y) is not None:
+            return ITEM_COLOR
+        if self.game_map.get_enemy_at(x, y) is not None:
+            return ENEMY_COLOR
+        return None
+
+    def rebuild_markers(self):
+        """扫描所有敌人和道具，重建标记表（每张地图一次，或变化记录丢失时）"""
+        size = self.game_map.size
+        markers = {}
         for e in self.game_map.enemies:
             if e.active and 0 <= e.x < size and 0 <= e.y < size:
-                ei = self.table.item(e.y, e.x)
-                if ei:
-                    ei.setBackground(QColor("#ff9999"))
-
-        # 标记道具
+                markers[(e.x, e.y)] = ENEMY_COLOR
         for i in self.game_map.items:
             if i.active and 0 <= i.x < size and 0 <= i.y < size:
-                ii = self.table.item(i.y, i.x)
-                if ii:
-                    ii.setBackground(QColor("#55ff55"))
-        
-        # 标记出口
+                markers[(i.x, i.y)] = ITEM_COLOR
         exit_x, exit_y = self.game_map.exit_point
         if 0 <= exit_x < size and 0 <= exit_y < size:
-            exit_item = self.table.item(exit_y, exit_x)
-            if exit_item:
-                exit_item.setBackground(QColor("#ffcc00"))
\ No newline at end of file
+            markers[(exit_x, exit_y)] = EXIT_COLOR
+        self._markers = markers
+        self._fog_image = None
+        self._change_position = self.game_map.change_position()
+
+    def sync_markers(self):
+        """
+        按地图变化记录更新标记表
+
+        返回标记发生变化的格子列表；需要完全重绘时返回None
+        """
+        if self._markers is None:
+            self.rebuild_markers()
+            return None
+        changes = self.game_map.changes_since(self._change_position)
+        if changes is None:
+            self.rebuild_markers()
+            return None
+        self._change_position = self.game_map.change_position()
+
+        dirty = []
+        for x, y in changes:
+            color = self.marker_color(x, y)
+            if color != self._markers.get((x, y)):
+                if color is None:
+                    del self._markers[(x, y)]
+                else:
+                    self._markers[(x, y)] = color
+            if self._fog_image is not None:
+                self._fog_image.setPixel(x, y, 1 if self.is_cell_explored(x, y) else 0)
+            dirty.append((x, y))
+        return dirty
+
+    def markers_in(self, first_x, first_y, last_x, last_y):
+        """范围内已探索的标记格子（范围内格子数少于标记数时逐格查询）"""
+        if (last_x - first_x + 1) * (last_y - first_y + 1) < len(self._markers):
+            cells = [(x, y) for y in range(first_y, last_y + 1) for x in range(first_x, last_x + 1)
+                     if (x, y) in self._markers]
+        else:
+            cells = [cell for cell in self._markers
+                     if first_x <= cell[0] <= last_x and first_y <= cell[1] <= last_y]
+        return [cell for cell in cells if self.is_cell_explored(*cell)]
+
+    def player_cell(self):
+        size = self.game_map.size
+        px, py = int(self.game_map.player_x), int(self.game_map.player_y)
+        if 0 <= px < size and 0 <= py < size:
+            return (px, py)
+        return None
+
+    def render(self):
+        """只请求重绘状态发生变化的格子（实际绘制在paintEvent中进行）"""
+        if self.game_map is None:
+            return
+        dirty = self.sync_markers()
+        player_cell = self.player_cell()
+        previous_cell = self._player_cell
+        self._player_cell = player_cell
+
+        # 窗口和概览模式的绘制代价固定，有变化时整体重绘
+        if self.active_mode() != MINIMAP_MODE_FULL:
+            if dirty is None or dirty or player_cell != previous_cell:
+                self.update()
+            return
+
+        cell_size = self.cell_size()
+        if dirty is None or self._wall_pixmap is None or self._wall_cell_size != cell_size:
+            self.update()
+            return
+
+        # 玩家跨越格子边界时，旧格子和新格子都需要重绘
+        if player_cell != previous_cell:
+            dirty.append(previous_cell)
+            dirty.append(player_cell)
+
+        for cell in dirty:
+            if cell is not None:
+                rect = self.cell_rect(cell[0], cell[1], cell_size)
+                self._queued_rects.append(rect)
+                self.update(rect)
+
+    def paint_rects(self, event):
+        """
+        本次需要重绘的矩形列表
+
+        Qt把多次 update(rect) 合并为一个区域，event.rect() 是其包围矩形：
+        玩家和远处的怪物同时移动时会覆盖大半张地图。重绘区域恰好由排队的格子组成时逐个重绘这些格子，
+        否则（窗口被遮挡后重新显示、整体刷新等）重绘包围矩形
+        """
+        rects = self._queued_rects
+        self._queued_rects = []
+        if not rects:
+            return [event.rect()]
+        queued = QRegion()
+        for rect in rects:
+            queued = queued.united(rect)
+        if not event.region().subtracted(queued).isEmpty():
+            return [event.rect()]
+        return rects
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        try:
+            self.paint_minimap(painter, self.paint_rects(event))
+        finally:
+            painter.end()
+
+    @profiled("minimap_render")
+    def paint_minimap(self, painter, rects):
+        """只重绘rects范围内的格子"""
+        for rect in rects:
+            painter.fillRect(rect, BACKGROUND_COLOR)
+        if self.game_map is None:
+            return
+        if self._markers is None:
+            self.rebuild_markers()
+        # 使用render记录的玩家格子，保证旧格子会被重绘
+        if self._player_cell is None:
+            self._player_cell = self.player_cell()
+
+        mode = self.active_mode()
+        if mode == MINIMAP_MODE_VIEWPORT:
+            self.paint_viewport(painter)
+        elif mode == MINIMAP_MODE_OVERVIEW:
+            self.paint_overview(painter)
+        else:
+            for rect in rects:
+                self.paint_full(painter, rect)
+
+    def paint_full(self, painter, rect):
+        """全图模式：从缓存的墙壁图像重绘rect范围，再叠加范围内的标记"""
+        cell_size = self.cell_size()
+        wall_pixmap = self.wall_pixmap(cell_size)
+        painter.drawPixmap(rect, wall_pixmap, rect)
+        size = self.game_map.size
+        painter.save()
+        painter.setClipRect(rect)
+        self.draw_fog(painter, QRect(0, 0, size * cell_size, size * cell_size))
+        painter.restore()
+
+        first_x = max(0, rect.left() // cell_size)
+        first_y = max(0, rect.top() // cell_size)
+        last_x = min(size - 1, rect.right() // cell_size)
+        last_y = min(size - 1, rect.bottom() // cell_size)
+
+        # 标记玩家位置
+        if self._player_cell is not None:
+            px, py = self._player_cell
+            if first_x <= px <= last_x and first_y <= py <= last_y:
+                painter.fillRect(self.cell_rect(px, py, cell_size), PLAYER_COLOR)
+
+        # 标记敌人、道具和出口
+        for x, y in self.markers_in(first_x, first_y, last_x, last_y):
+            painter.fillRect(self.cell_rect(x, y, cell_size), self._markers[(x, y)])
+
+    def paint_viewport(self, painter):
+        """窗口模式：只画玩家周围 VIEWPORT_CELLS x VIEWPORT_CELLS 个格子"""
+        origin, cells, cell_size = self.viewport_layout()
+        extent = cells * cell_size
+        painter.drawImage(QRect(0, 0, extent, extent), self.level_image(0),
+                          QRect(origin[0], origin[1], cells, cells))
+        self.draw_grid_lines(painter, cells, cell_size)
+        self.draw_fog(painter, QRect(0, 0, extent, extent), QRect(origin[0], origin[1], cells, cells))
+
+        if self._player_cell is not None:
+            painter.fillRect(self.cell_rect(*self._player_cell, cell_size, origin), PLAYER_COLOR)
+        last_x = origin[0] + cells - 1
+        last_y = origin[1] + cells - 1
+        for x, y in self.markers_in(origin[0], origin[1], last_x, last_y):
+            painter.fillRect(self.cell_rect(x, y, cell_size, origin), self._markers[(x, y)])
+
+    def paint_overview(self, painter):
+        """概览模式：画降采样后的全图，只标记玩家和出口"""
+        level, side, block_size = self.overview_layout()
+        painter.drawImage(QRect(0, 0, side * block_size, side * block_size), self.level_image(level))
+        # 迷雾图层按格子缩放到与降采样图像相同的范围
+        fog_extent = self.game_map.size * block_size / (1 << level)
+        self.draw_fog(painter, QRectF(0, 0, fog_extent, fog_extent))
+
+        exit_x, exit_y = self.game_map.exit_point
+        if self.is_cell_explored(exit_x, exit_y):
+            painter.fillRect(QRect((exit_x >> level) * block_size, (exit_y >> level) * block_size,
+                                   block_size, block_size), EXIT_COLOR)
+        if self._player_cell is not None:
+            px, py = self._player_cell
+            painter.fillRect(QRect((px >> level) * block_size, (py >> level) * block_size,
+                                   block_size, block_size), PLAYER_COLOR)
+
+    def cell_at(self, x, y):
+        """把窗口坐标换算为格子坐标，不在地图上时返回None"""
+        mode = self.active_mode()
+        if mode == MINIMAP_MODE_VIEWPORT:
+            origin, cells, cell_size = self.viewport_layout()
+            cell_x, cell_y = x // cell_size, y // cell_size
+            if not (0 <= cell_x < cells and 0 <= cell_y < cells):
+                return None
+            cell_x += origin[0]
+            cell_y += origin[1]
+        elif mode == MINIMAP_MODE_OVERVIEW:
+            level, side, block_size = self.overview_layout()
+            block = 1 << level
+            # 取块的中心格子
+            cell_x = (x // block_size) * block + block // 2
+            cell_y = (y // block_size) * block + block // 2
+        else:
+            cell_size = self.cell_size()
+            cell_x, cell_y = x // cell_size, y // cell_size
+        if 0 <= cell_x < self.game_map.size and 0 <= cell_y < self.game_map.size:
+            return (cell_x, cell_y)
+        return None
+
+    def mousePressEvent(self, event):
+        """左键把点击位置换算为格子坐标，右键切换显示模式"""
+        if self.game_map is not None and event.button() == Qt.MouseButton.LeftButton:
+            cell = self.cell_at(int(event.position().x()), int(event.position().y()))
+            if cell is not None:
+                self.map_clicked.emit(*cell)
+                return
+        if event.button() == Qt.MouseButton.RightButton:
+            self.set_mode(MINIMAP_MODES[(MINIMAP_MODES.index(self.mode) + 1) % len(MINIMAP_MODES)])
+            return
+        super().mousePressEvent(event)
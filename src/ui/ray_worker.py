@@ -0,0 +1,44 @@
+import time
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from ..systems.raycaster import RAY_CASTER_NUMPY, cast_columns, project_columns, column_depths
+
+class RayJobSignals(QObject):
+    """后台射线任务的结果信号（在界面线程中接收）"""
+    finished = pyqtSignal(int, object, float)  # 任务编号, (墙壁切片, 深度缓冲)（出错时为None）, 计算耗时（毫秒）
+
+class RayJob(QRunnable):
+    """
+    在线程池中计算一帧的射线命中、墙壁切片和深度缓冲
+
+    只读取不可变的地图快照和提交时的视角参数，不接触任何界面对象；
+    给出射线命中表时改为查表（尚未计算的视角在工作线程中填入命中表）。
+    结果通过信号交回界面线程绘制
+    """
+    def __init__(self, job_id, snapshot, px, py, player_dir, num_rays, ray_caster, ray_table=None):
+        super().__init__()
+        self.signals = RayJobSignals()
+        self.job_id = job_id
+        self.snapshot = snapshot
+        self.px = px
+        self.py = py
+        self.player_dir = player_dir
+        self.num_rays = num_rays
+        self.ray_caster = ray_caster
+        self.ray_table = ray_table
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            if self.ray_table is not None:
+                columns = self.ray_table.lookup(self.px, self.py, self.player_dir, self.num_rays)
+            else:
+                grid_array = None
+                if self.ray_caster == RAY_CASTER_NUMPY:
+                    grid_array = self.snapshot.as_array()
+                columns = cast_columns(self.snapshot, self.px, self.py, self.player_dir,
+                                       self.num_rays, self.ray_caster, grid_array)
+            result = (project_columns(columns, self.num_rays), column_depths(columns))
+        except Exception as e:
+            print(f"后台射线计算出错: {e}")
+            result = None
+        self.signals.finished.emit(self.job_id, result, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,68 @@
+from PyQt6.QtCore import QLineF, QRectF, QRect
+from PyQt6.QtGui import QTextDocument, QAbstractTextDocumentLayout, QPalette, QPixmap, QTransform
+
+class SceneCanvas:
+    """把绘制指令转换为QGraphicsScene图元（每帧重建场景）"""
+    def __init__(self, scene):
+        self.scene = scene
+
+    def draw_rect(self, x, y, width, height, pen, brush):
+        self.scene.addRect(x, y, width, height, pen, brush)
+
+    def draw_path(self, path, pen, brush):
+        self.scene.addPath(path, pen, brush)
+
+    def draw_line(self, x1, y1, x2, y2, pen):
+        self.scene.addLine(x1, y1, x2, y2, pen)
+
+    def draw_image(self, x, y, width, height, image, sx, sy, sw, sh):
+        """把图像的 (sx, sy, sw, sh) 区域缩放绘制到 (x, y, width, height)"""
+        pixmap_item = self.scene.addPixmap(QPixmap.fromImage(image.copy(QRect(int(sx), int(sy), int(sw), int(sh)))))
+        pixmap_item.setPos(x, y)
+        pixmap_item.setTransform(QTransform.fromScale(width / sw, height / sh))
+
+    def draw_text(self, text, font, color, x=0, y=0):
+        text_item = self.scene.addText(text, font)
+        text_item.setDefaultTextColor(color)
+        text_item.setPos(x, y)
+
+class PainterCanvas:
+    """直接用QPainter绘制到离屏缓冲区（不创建任何图元）"""
+    def __init__(self, painter, text_documents=None):
+        self.painter = painter
+        # 文本排版缓存，可由调用方跨帧复用
+        self.text_documents = text_documents if text_documents is not None else {}
+
+    def draw_rect(self, x, y, width, height, pen, brush):
+        self.painter.setPen(pen)
+        self.painter.setBrush(brush)
+        self.painter.drawRect(QRectF(x, y, width, height))
+
+    def draw_path(self, path, pen, brush):
+        self.painter.setPen(pen)
+        self.painter.setBrush(brush)
+        self.painter.drawPath(path)
+
+    def draw_line(self, x1, y1, x2, y2, pen):
+        self.painter.setPen(pen)
+        self.painter.drawLine(QLineF(x1, y1, x2, y2))
+
+    def draw_image(self, x, y, width, height, image, sx, sy, sw, sh):
+        """把图像的 (sx, sy, sw, sh) 区域缩放绘制到 (x, y, width, height)"""
+        self.painter.drawImage(QRectF(x, y, width, height), image, QRectF(sx, sy, sw, sh))
+
+    def draw_text(self, text, font, color, x=0, y=0):
+        # 与QGraphicsTextItem使用相同的文档排版，保证输出一致
+        document = self.text_documents.get((text, font.key()))
+        if document is None:
+            document = QTextDocument()
+            document.setDefaultFont(font)
+            document.setPlainText(text)
+            self.text_documents[(text, font.key())] = document
+
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.ColorRole.Text, color)
+        self.painter.save()
+        self.painter.translate(x, y)
+        document.documentLayout().draw(self.painter, context)
+        self.painter.restore()
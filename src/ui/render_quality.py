@@ -0,0 +1,74 @@
+from .wall_textures import WALL_DETAIL_FLAT, WALL_DETAIL_TEXTURE
+
+# 渲染质量等级（由高到低）
+QUALITY_LEVELS = [
+    {"name": "超高", "num_rays": 400, "wall_detail": WALL_DETAIL_TEXTURE, "render_scale": 1.0, "antialiasing": True},
+    {"name": "高", "num_rays": 240, "wall_detail": WALL_DETAIL_TEXTURE, "render_scale": 1.0, "antialiasing": True},
+    {"name": "中", "num_rays": 120, "wall_detail": WALL_DETAIL_TEXTURE, "render_scale": 1.0, "antialiasing": True},
+    {"name": "低", "num_rays": 80, "wall_detail": WALL_DETAIL_TEXTURE, "render_scale": 0.75, "antialiasing": False},
+    {"name": "最低", "num_rays": 60, "wall_detail": WALL_DETAIL_FLAT, "render_scale": 0.5, "antialiasing": False},
+]
+DEFAULT_QUALITY_LEVEL = 2
+
+class RenderQualityGovernor:
+    """
+    根据每帧渲染耗时自动调整渲染质量，使帧时间保持在预算以内
+
+    耗时的滑动平均超过预算时降低一级质量；
+    明显低于预算（upgrade_ratio）一段时间后再提升一级，避免来回抖动
+    """
+    def __init__(self, budget_ms=33.0, levels=None, start_level=DEFAULT_QUALITY_LEVEL,
+                 min_samples=5, upgrade_ratio=0.5, smoothing=0.2):
+        self.budget_ms = budget_ms
+        self.levels = levels or QUALITY_LEVELS
+        self.level_index = max(0, min(start_level, len(self.levels) - 1))
+        self.min_samples = min_samples
+        self.upgrade_ratio = upgrade_ratio
+        self.smoothing = smoothing
+        self.last_ms = 0.0
+        self.average_ms = None
+        self.samples_since_change = 0
+
+    @property
+    def level(self):
+        """当前质量等级参数"""
+        return self.levels[self.level_index]
+
+    def record(self, frame_ms):
+        """记录一帧的渲染耗时，质量等级改变时返回True"""
+        self.last_ms = frame_ms
+        if self.average_ms is None:
+            self.average_ms = frame_ms
+        else:
+            self.average_ms += (frame_ms - self.average_ms) * self.smoothing
+        self.samples_since_change += 1
+
+        if self.samples_since_change < self.min_samples:
+            return False
+
+        # 超出预算：降低质量
+        if self.average_ms > self.budget_ms and self.level_index < len(self.levels) - 1:
+            return self._set_level(self.level_index + 1)
+
+        # 远低于预算且持续足够久：提升质量
+        if (self.average_ms < self.budget_ms * self.upgrade_ratio
+                and self.samples_since_change >= self.min_samples * 2
+                and self.level_index > 0):
+            return self._set_level(self.level_index - 1)
+
+        return False
+
+    def _set_level(self, level_index):
+        self.level_index = level_index
+        self.samples_since_change = 0
+        # 新等级的耗时与旧等级不同，重新开始统计
+        self.average_ms = None
+        return True
+
+    def stats_text(self):
+        """开发者面板显示的统计信息"""
+        level = self.level
+        average = self.average_ms if self.average_ms is not None else self.last_ms
+        return (f"渲染质量: {level['name']} ({level['num_rays']}列, {level['wall_detail']}, "
+                f"{int(level['render_scale'] * 100)}%)，"
+                f"耗时 {self.last_ms:.1f}ms / 平均 {average:.1f}ms / 预算 {self.budget_ms:.0f}ms")
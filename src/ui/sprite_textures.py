@@ -0,0 +1,78 @@
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QImage, QPainter, QColor, QPen, QBrush, QPolygonF
+from .wall_textures import band_brightness
+from ..systems.sprites import SPRITE_ENEMY, SPRITE_BOSS, SPRITE_ITEM
+
+SPRITE_TEXTURE_SIZE = 64  # 精灵图像宽高（像素）
+
+# 精灵相对于单位墙高的大小
+SPRITE_SCALES = {
+    SPRITE_ENEMY: 0.7,
+    SPRITE_BOSS: 0.95,
+    SPRITE_ITEM: 0.35,
+}
+
+# 精灵基础颜色
+SPRITE_COLORS = {
+    SPRITE_ENEMY: (200, 60, 60),
+    SPRITE_BOSS: (160, 40, 190),
+    SPRITE_ITEM: (230, 190, 40),
+}
+
+class SpriteTextureCache:
+    """按精灵类型和亮度分档缓存广告牌图像（透明背景），每种组合只生成一次"""
+    def __init__(self):
+        self._textures = {}
+
+    def get(self, kind, band):
+        """获取精灵图像（QImage），不存在时生成"""
+        key = (kind, band)
+        texture = self._textures.get(key)
+        if texture is None:
+            texture = self._build_texture(kind, band)
+            self._textures[key] = texture
+        return texture
+
+    def clear(self):
+        self._textures.clear()
+
+    def _build_texture(self, kind, band):
+        """生成一张精灵图像"""
+        brightness = band_brightness(band)
+        base = SPRITE_COLORS.get(kind, SPRITE_COLORS[SPRITE_ENEMY])
+        color = QColor(*(int(c * brightness) for c in base))
+        size = SPRITE_TEXTURE_SIZE
+
+        texture = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+        texture.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(texture)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(color.darker(160), 2))
+        painter.setBrush(QBrush(color))
+        if kind == SPRITE_ITEM:
+            # 宝石形状
+            painter.drawPolygon(QPolygonF([
+                QPointF(size * 0.5, 2), QPointF(size - 2, size * 0.4),
+                QPointF(size * 0.5, size - 2), QPointF(2, size * 0.4),
+            ]))
+        else:
+            # 怪物身体
+            painter.drawEllipse(QRectF(size * 0.12, size * 0.2, size * 0.76, size * 0.78))
+            # 眼睛
+            eye_color = QColor(*(int(255 * brightness) for _ in range(3)))
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QBrush(eye_color))
+            painter.drawEllipse(QRectF(size * 0.3, size * 0.4, size * 0.14, size * 0.14))
+            painter.drawEllipse(QRectF(size * 0.56, size * 0.4, size * 0.14, size * 0.14))
+            if kind == SPRITE_BOSS:
+                # Boss头冠
+                crown_color = QColor(*(int(c * brightness) for c in SPRITE_COLORS[SPRITE_ITEM]))
+                painter.setBrush(QBrush(crown_color))
+                painter.drawPolygon(QPolygonF([
+                    QPointF(size * 0.25, size * 0.22), QPointF(size * 0.3, 2), QPointF(size * 0.42, size * 0.14),
+                    QPointF(size * 0.5, 0), QPointF(size * 0.58, size * 0.14), QPointF(size * 0.7, 2),
+                    QPointF(size * 0.75, size * 0.22),
+                ]))
+        painter.end()
+        return texture
@@ -0,0 +1,64 @@
+from PyQt6.QtGui import QImage, QPainter, QColor, QPen
+from ..systems.raycaster import WALL_BASE_COLORS
+
+# 墙壁细节等级
+WALL_DETAIL_FLAT = "flat"  # 纯色梯形
+WALL_DETAIL_BRICKS = "bricks"  # 梯形 + 逐行砖缝线条（旧方式）
+WALL_DETAIL_TEXTURE = "texture"  # 预生成砖墙纹理，每列一次贴图
+
+TEXTURE_SIZE = 64  # 纹理宽高（像素）
+BRICK_HEIGHT = 8  # 砖块高度（纹理像素）
+BRICK_WIDTH = 16  # 砖块宽度（纹理像素）
+BRIGHTNESS_BANDS = 16  # 亮度分档数量
+MIN_BRIGHTNESS = 0.3
+
+MORTAR_COLOR = (50, 50, 50)
+
+def brightness_band(brightness):
+    """把亮度系数（0.3~1）量化为分档下标"""
+    ratio = (brightness - MIN_BRIGHTNESS) / (1 - MIN_BRIGHTNESS)
+    return max(0, min(BRIGHTNESS_BANDS - 1, int(ratio * (BRIGHTNESS_BANDS - 1) + 0.5)))
+
+def band_brightness(band):
+    """分档下标对应的亮度系数"""
+    return MIN_BRIGHTNESS + (1 - MIN_BRIGHTNESS) * band / (BRIGHTNESS_BANDS - 1)
+
+class WallTextureCache:
+    """按墙面类型和亮度分档缓存砖墙纹理，每种组合只生成一次"""
+    def __init__(self):
+        self._textures = {}
+
+    def get(self, wall_type, band):
+        """获取纹理（QImage），不存在时生成"""
+        key = (wall_type, band)
+        texture = self._textures.get(key)
+        if texture is None:
+            texture = self._build_texture(wall_type, band)
+            self._textures[key] = texture
+        return texture
+
+    def clear(self):
+        self._textures.clear()
+
+    def _build_texture(self, wall_type, band):
+        """生成一张砖墙纹理"""
+        brightness = band_brightness(band)
+        base = WALL_BASE_COLORS.get(wall_type, WALL_BASE_COLORS["vertical"])
+        brick_color = QColor(*(int(c * brightness) for c in base))
+        mortar_color = QColor(*(int(c * brightness) for c in MORTAR_COLOR))
+
+        texture = QImage(TEXTURE_SIZE, TEXTURE_SIZE, QImage.Format.Format_RGB32)
+        texture.fill(brick_color)
+
+        painter = QPainter(texture)
+        painter.setPen(QPen(mortar_color, 1))
+        for row in range(TEXTURE_SIZE // BRICK_HEIGHT):
+            y = row * BRICK_HEIGHT
+            # 水平砖缝
+            painter.drawLine(0, y, TEXTURE_SIZE - 1, y)
+            # 竖直砖缝（相邻行错开半块砖）
+            offset = 0 if row % 2 == 0 else BRICK_WIDTH // 2
+            for x in range(offset, TEXTURE_SIZE, BRICK_WIDTH):
+                painter.drawLine(x, y, x, y + BRICK_HEIGHT - 1)
+        painter.end()
+        return texture